@@ -0,0 +1,78 @@
+"""Per-lane formatting against the compiled per-notation formatters of RegisterPrintFormatter.
+
+    python benchmarks/bench_formatter.py
+
+`reference_format` is the formatter as it was before notations were compiled: one `match` per
+lane. Both sides format the same decoded lanes, and their output is checked to be identical
+before anything is timed.
+"""
+import argparse
+import pathlib
+import random
+import sys
+import timeit
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "src"))
+
+from ast_formatter import NotationInfo, RegisterNotationParser, RegisterPrintFormatter  # noqa: E402
+
+ZMM_BYTES = 64
+EXPRESSIONS = ["$zmm0:b8", "$zmm0:u8", "$zmm0:x8", "$zmm0:d8", "$zmm0:x16", "$zmm0:u32", "$zmm0:f32", "$zmm0:x64", "$zmm0:d128"]
+
+
+def reference_value(radix: NotationInfo.NotationRadix, unit: int, value: int | float):
+    match (radix, unit):
+        case (NotationInfo.NotationRadix.Hexadecimal, _):
+            return f"{value:#0{(unit // 4) + 2}x}"
+        case (NotationInfo.NotationRadix.Octal, _):
+            return f"{value:#0{unit // 3 + 2}o}"
+        case (NotationInfo.NotationRadix.SignedDecimal, _):
+            return str(value)
+        case (NotationInfo.NotationRadix.UnsignedDecimal, _):
+            return str(value)
+        case (NotationInfo.NotationRadix.Binary, _):
+            return f"{value:#0{unit + 2}b}"
+        case (NotationInfo.NotationRadix.Float, 16 | 32 | 64):
+            return str(value)
+        case _:
+            return None
+
+
+def reference_format(formatter: RegisterPrintFormatter, notation: NotationInfo, value: int) -> list:
+    unit, lanes = formatter.lane_values(notation.radix, notation.unit, ZMM_BYTES, value)
+    return [reference_value(notation.radix, unit, lane) for lane in lanes]
+
+
+def compiled_format(formatter: RegisterPrintFormatter, notation: NotationInfo, value: int) -> list:
+    unit, lanes = formatter.lane_values(notation.radix, notation.unit, ZMM_BYTES, value)
+    return formatter.compile_notation(notation.radix, unit)(lanes)
+
+
+def best(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=2000, help="calls per timing repeat")
+    args = parser.parse_args()
+
+    notation_parser = RegisterNotationParser()
+    formatter = RegisterPrintFormatter([])
+    values = [random.Random(seed).getrandbits(ZMM_BYTES * 8) for seed in range(16)]
+
+    print(f"{'expression':<14}{'per-lane':>14}{'compiled':>14}{'speedup':>10}")
+    for expr in EXPRESSIONS:
+        notation = notation_parser.parse_register(expr).reg_notation
+        for value in values:
+            if reference_format(formatter, notation, value) != compiled_format(formatter, notation, value):
+                print(f"{expr}: compiled output differs from the per-lane formatter")
+                return 1
+        before = best(lambda: [reference_format(formatter, notation, value) for value in values], args.number) / len(values)
+        after = best(lambda: [compiled_format(formatter, notation, value) for value in values], args.number) / len(values)
+        print(f"{expr:<14}{before * 1e6:>12.2f}us{after * 1e6:>12.2f}us{before / after:>9.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
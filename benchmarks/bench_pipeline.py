@@ -0,0 +1,152 @@
+"""Per-stage timings of the rezister pipeline: parse -> fetch -> format -> render.
+
+    python benchmarks/bench_pipeline.py --save-baseline   # record baseline.json on this machine
+    python benchmarks/bench_pipeline.py                   # compare against it
+
+Every register width from 8 to 512 bits is timed with every notation that fits it. Timings are
+the mean over notations, per register width, of the best of several repeats. A stage slower than
+the baseline by more than --threshold is reported as a regression (exit status 1).
+
+Timings are absolute, so a baseline only means something on the machine that recorded it:
+baseline.json is not committed, and without one the timings are only printed.
+"""
+import argparse
+import contextlib
+import io
+import json
+import pathlib
+import sys
+import timeit
+
+import fake_gef
+
+BASELINE_PATH = pathlib.Path(__file__).resolve().parent / "baseline.json"
+
+REGISTERS = {8: "al", 16: "ax", 32: "eax", 64: "rax", 80: "st0", 128: "xmm0", 256: "ymm0", 512: "zmm0"}
+RADIXES = "xodubfc"
+UNITS = (8, 16, 32, 64, 128, 256, 512)
+
+
+def notations(width: int) -> list[str]:
+    return [f"{radix}{unit}" for radix in RADIXES for unit in UNITS if unit <= max(width, 8)]
+
+
+@contextlib.contextmanager
+def quiet():
+    # do_invoke prints; keep the terminal out of the measurement.
+    with contextlib.redirect_stdout(io.StringIO()) as sink:
+        yield sink
+
+
+def best(func, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def measure(number: int) -> dict[str, dict[str, float]]:
+    inferior = fake_gef.FakeInferior(seed=1)
+    ext = fake_gef.load_extension(inferior)
+    cmd = ext.ExtendedRegisterCommand()
+    cmd["register_cache"] = ""
+    with quiet():
+        cmd.do_invoke(["$rax"])
+    fake_gef.stop(inferior)
+
+    parser = cmd._RegisterNotationParser
+    retriever = cmd._RegisterValueRetriever
+    formatter = cmd._RegisterPrintFormatter
+    snapshot = retriever.snapshot
+
+    results: dict[str, dict[str, float]] = {}
+    for width, reg_name in REGISTERS.items():
+        exprs = [f"${reg_name}:{notation}" for notation in notations(width)]
+        dumps = [parser.parse_register(expr) for expr in exprs]
+        prop = dumps[0].reg_property
+        field_width = retriever.index[reg_name].size
+        retriever.history.track(reg_name)
+        fake_gef.stop(inferior, mutate=0)
+        inferior.registers[reg_name] = inferior.random.randbytes(field_width)
+        snapshot.invalidate()
+        value = retriever.retrieve_value(prop)
+        prev_value = retriever.retrieve_prev_value(prop)
+
+        def fetch_cold():
+            snapshot.invalidate()
+            retriever.retrieve_value(prop)
+
+        def format_all():
+            for dump in dumps:
+                formatter.string_register(dump.reg_notation, field_width, value)
+
+        def render_all():
+            for dump in dumps:
+                curr_string = formatter.string_register(dump.reg_notation, field_width, value)
+                changed = formatter.changed_lanes(dump.reg_notation, field_width, value, prev_value)
+                cmd.colorize(curr_string, changed)
+
+        def invoke_all():
+            cmd.do_invoke(exprs)
+            sys.stdout.seek(0)
+            sys.stdout.truncate()
+
+        count = len(exprs)
+        stages = {
+            "parse (cold)": best(lambda: [parser._parse(expr) for expr in exprs], number) / count,
+            "parse (cached)": best(lambda: [parser.parse_register(expr) for expr in exprs], number) / count,
+            "retrieve_value (cold)": best(fetch_cold, number),
+            "retrieve_value (snapshot)": best(lambda: retriever.retrieve_value(prop), number),
+            "retrieve_prev_value": best(lambda: retriever.retrieve_prev_value(prop), number),
+            "string_register": best(format_all, number) / count,
+            "diff + colorize": best(render_all, number) / count,
+        }
+        with quiet():
+            stages["do_invoke"] = best(invoke_all, max(number // 10, 1)) / count
+        results[f"{width}-bit ${reg_name}"] = stages
+    return results
+
+
+def report(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], threshold: float) -> list[str]:
+    regressions = []
+    stages = list(next(iter(results.values())))
+    print(f"{'register':<18}" + "".join(f"{stage:>27}" for stage in stages))
+    for register, timings in results.items():
+        row = f"{register:<18}"
+        for stage in stages:
+            cell = f"{timings[stage] * 1e6:.2f}us"
+            base = baseline.get(register, {}).get(stage)
+            if base:
+                ratio = timings[stage] / base
+                cell += f" ({ratio:4.2f}x)"
+                if ratio > 1 + threshold:
+                    regressions.append(f"{register} {stage}: {base * 1e6:.2f}us -> {timings[stage] * 1e6:.2f}us")
+            row += f"{cell:>27}"
+        print(row)
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200, help="calls per timing repeat")
+    parser.add_argument("--threshold", type=float, default=0.5, help="allowed slowdown against the baseline")
+    parser.add_argument("--baseline", type=pathlib.Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = measure(args.number)
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if not baseline and not args.save_baseline:
+        print(f"no baseline at {args.baseline}: run with --save-baseline first to compare against this machine\n")
+    regressions = report(results, {} if args.save_baseline else baseline, args.threshold)
+
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline saved to {args.baseline}")
+        return 0
+    if regressions:
+        print("\nregressions:")
+        print("\n".join(f"  {line}" for line in regressions))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""Per-lookup cost of the register index against the regex scan it replaced.
+
+    python benchmarks/bench_register_index.py
+"""
+import re
+import timeit
+
+import fake_gef
+
+ext = fake_gef.load_extension()
+
+REGEX_TABLE = [
+    ("xmm[0-9]+", 16), ("ymm[0-9]+", 32), ("zmm[0-9]+", 64), ("k[0-7]", 8),
+    ("st[0-7]", 10), ("r[a-z]+", 8), ("e[a-z]+", 4), ("[a-z]+", 8),
+]
+
+
+def regex_lookup(name: str):
+    for regex, size in REGEX_TABLE:
+        if re.findall(regex, name) != []:
+            return size
+
+
+def main() -> None:
+    text = fake_gef.REGISTER_GROUPS_PATH.read_text()
+    build = min(timeit.repeat(lambda: ext.RegisterIndex.from_maint_output(text), number=20, repeat=5)) / 20
+    index = ext.RegisterIndex.from_maint_output(text)
+    names = [reg.name for reg in index]
+    rounds = 200
+
+    scan = min(timeit.repeat(lambda: [regex_lookup(name) for name in names], number=rounds, repeat=5))
+    hit = min(timeit.repeat(lambda: [index[name].size for name in names], number=rounds, repeat=5))
+    per_scan = scan / (rounds * len(names)) * 1e9
+    per_hit = hit / (rounds * len(names)) * 1e9
+
+    print(f"registers          : {len(names)} ({len(index.groups)} groups)")
+    print(f"index build        : {build * 1e6:9.1f} us")
+    print(f"regex scan lookup  : {per_scan:9.1f} ns/lookup")
+    print(f"index lookup       : {per_hit:9.1f} ns/lookup ({per_scan / per_hit:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
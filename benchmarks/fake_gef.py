@@ -0,0 +1,307 @@
+"""Stand-ins for the gdb/gef globals gef_pprint_register.py expects, so it can be imported outside gdb.
+
+Registers are synthetic: every register of data/x86_64_register_groups.txt holds random bytes,
+and `stop()` fires the cont event, mutates some of them and fires the stop event, like a `stepi` would. 1 MiB of
+random memory is mapped at MEMORY_BASE.
+"""
+import argparse
+import builtins
+import importlib.util
+import pathlib
+import random
+import types
+
+ROOT = pathlib.Path(__file__).resolve().parent
+EXTENSION_PATH = ROOT.parent / "src" / "gef_pprint_register.py"
+REGISTER_GROUPS_PATH = ROOT / "data" / "x86_64_register_groups.txt"
+
+MEMORY_BASE = 0x7ffd00000000
+
+TYPE_CODE_VOID = 0
+TYPE_CODE_PTR = 1
+TYPE_CODE_ARRAY = 2
+TYPE_CODE_UNION = 4
+TYPE_CODE_ENUM = 5
+TYPE_CODE_FLAGS = 6
+TYPE_CODE_INT = 8
+TYPE_CODE_FLT = 9
+TYPE_CODE_CHAR = 20
+TYPE_CODE_BOOL = 21
+
+
+class FakeEventRegistry:
+    def __init__(self) -> None:
+        self.handlers = []
+
+    def connect(self, handler) -> None:
+        self.handlers.append(handler)
+
+    def disconnect(self, handler) -> None:
+        self.handlers.remove(handler)
+
+    def fire(self, event=None) -> None:
+        for handler in list(self.handlers):
+            handler(event)
+
+
+class FakeGdbError(RuntimeError):
+    pass
+
+
+class FakeMemoryError(FakeGdbError):
+    pass
+
+
+class FakeType:
+    def __init__(self, code: int, sizeof: int) -> None:
+        self.code = code
+        self.sizeof = sizeof
+
+    def strip_typedefs(self) -> "FakeType":
+        return self
+
+
+class FakeBreakpoint:
+    count = 0
+
+    def __init__(self, spec: str) -> None:
+        FakeBreakpoint.count += 1
+        self.number = FakeBreakpoint.count
+        self.location = spec
+
+    def is_valid(self) -> bool:
+        return True
+
+
+class FakeValue:
+    bytes = b""
+
+    def __init__(self, raw: bytes, code: int = TYPE_CODE_INT) -> None:
+        self.bytes = raw
+        self.type = FakeType(code, len(raw))
+
+    def __int__(self) -> int:
+        bits = int.from_bytes(self.bytes, "little")
+        if self.type.code == TYPE_CODE_FLT:
+            # Like gdb, int() of a float register converts its value (x87 extended here), it does not give the bits.
+            exponent, mantissa = (bits >> 64) & 0x7fff, bits & ((1 << 64) - 1)
+            if exponent == 0x7fff:
+                raise FakeGdbError("Cannot convert value to integer: value is not a number")
+            value = mantissa >> max(0, 16383 + 63 - exponent) if exponent >= 16383 else 0
+            return -value if bits >> 79 else value
+        return bits
+
+
+class FakeFrame:
+    def __init__(self, inferior: "FakeInferior") -> None:
+        self.inferior = inferior
+        self.read_count = 0
+
+    def read_register(self, reg_name: str) -> FakeValue:
+        self.read_count += 1
+        if reg_name not in self.inferior.registers:
+            raise ValueError(f"Bad register {reg_name}")
+        return FakeValue(self.inferior.registers[reg_name], self.inferior.type_codes.get(reg_name, TYPE_CODE_INT))
+
+    def select(self) -> None:
+        pass
+
+    def pc(self) -> int:
+        return int.from_bytes(self.inferior.registers["rip"], "little")
+
+    def __eq__(self, other) -> bool:
+        return self is other
+
+
+class FakeThread:
+    def __init__(self, inferior: "FakeInferior", num: int) -> None:
+        self.inferior = inferior
+        self.num = self.global_num = num
+        self.ptid = (1, 1000 + num, 0)
+
+    def is_valid(self) -> bool:
+        return True
+
+    def is_running(self) -> bool:
+        return False
+
+    def switch(self) -> None:
+        self.inferior.thread = self
+
+
+class FakeInferior:
+    def __init__(self, seed: int = 0, threads: int = 1) -> None:
+        self.random = random.Random(seed)
+        self.register_groups = REGISTER_GROUPS_PATH.read_text()
+        self.sizes = {
+            fields[0]: int(fields[4])
+            for fields in map(str.split, self.register_groups.splitlines()[1:])
+            if fields[0] != "''"
+        }
+        self.type_codes = {
+            fields[0]: TYPE_CODE_FLT
+            for fields in map(str.split, self.register_groups.splitlines()[1:])
+            if len(fields) > 5 and fields[5] == "i387_ext"
+        }
+        registers = {name: self.random.randbytes(size) for name, size in self.sizes.items()}
+        # Threads start with the same registers; `registers` is the selected thread's.
+        self.thread_registers = {num: dict(registers) for num in range(1, threads + 1)}
+        self.threads = [FakeThread(self, num) for num in range(1, threads + 1)]
+        self.memory = bytes(self.random.randbytes(1 << 20))
+        self.frame = FakeFrame(self)
+        self.thread = self.threads[0]
+
+    @property
+    def registers(self) -> dict[str, bytes]:
+        return self.thread_registers[self.thread.global_num]
+
+    def read_memory(self, address: int, length: int) -> memoryview:
+        offset = address - MEMORY_BASE
+        if offset < 0 or offset + length > len(self.memory):
+            raise FakeMemoryError(f"Cannot access memory at address {address:#x}")
+        return memoryview(self.memory)[offset:offset + length]
+
+    def mutate(self, count: int = 4) -> None:
+        for name in self.random.sample(sorted(self.registers), count):
+            raw = bytearray(self.registers[name])
+            raw[self.random.randrange(len(raw))] ^= 1 << self.random.randrange(8)
+            self.registers[name] = bytes(raw)
+
+
+class Color:
+    COLORS = {"normal": "\033[0m", "bold": "\033[1m", "yellow": "\033[33m", "blue": "\033[34m", "red": "\033[31m"}
+
+    @staticmethod
+    def colorify(text, attrs: str) -> str:
+        colors = "".join(Color.COLORS[attr] for attr in attrs.split())
+        return f"{colors}{text}{Color.COLORS['normal']}"
+
+
+class ContextCommand:
+    def __init__(self) -> None:
+        self.old_registers = {}
+
+
+class GenericCommand:
+    def __init__(self, *args, **kwargs) -> None:
+        self.settings = {}
+
+    def __getitem__(self, key: str):
+        return self.settings[key]
+
+    def __setitem__(self, key: str, value) -> None:
+        self.settings[key] = value[0] if isinstance(value, tuple) else value
+
+
+CONTEXT_PANES = {}
+
+
+def _register_context_pane(name, display, title, condition=None) -> None:
+    CONTEXT_PANES[name] = (display, title, condition)
+
+
+def _passthrough(func):
+    return func
+
+
+def _parse_arguments(required, optional):
+    # Mirrors gef's decorator: the argparse parser is built from both dicts on every call.
+    def decorator(func):
+        def wrapper(self, argv, **kwargs):
+            parser = argparse.ArgumentParser(prog=self._cmdline_)
+            for name, default in required.items():
+                parser.add_argument(name, nargs="*", default=default)
+            for name, default in optional.items():
+                if isinstance(default, bool):
+                    parser.add_argument(name, action="store_false" if default else "store_true")
+                else:
+                    parser.add_argument(name, type=type(default), default=default)
+            kwargs["arguments"] = parser.parse_args(argv)
+            return func(self, argv, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _make_gdb(inferior: FakeInferior) -> types.ModuleType:
+    gdb = types.ModuleType("gdb")
+    gdb.error = FakeGdbError
+    gdb.MemoryError = FakeMemoryError
+    gdb.Value = FakeValue
+    gdb.Breakpoint = FakeBreakpoint
+    for name, value in globals().items():
+        if name.startswith("TYPE_CODE_"):
+            setattr(gdb, name, value)
+    gdb.events = types.SimpleNamespace(
+        stop=FakeEventRegistry(),
+        cont=FakeEventRegistry(),
+        exited=FakeEventRegistry(),
+        memory_changed=FakeEventRegistry(),
+        register_changed=FakeEventRegistry(),
+        new_objfile=FakeEventRegistry(),
+        clear_objfiles=FakeEventRegistry(),
+    )
+    groups = dict.fromkeys(
+        group
+        for line in inferior.register_groups.splitlines()[1:] if len(line.split()) > 6
+        for group in line.split()[6].split(",")
+    )
+    maint = {
+        "maint print register-groups": inferior.register_groups,
+        "maint print reggroups": " Group      Type      \n" + "".join(f" {group:<10} user\n" for group in groups),
+        "maint print xml-tdesc": inferior.register_groups,
+    }
+
+    def execute(command: str, to_string: bool = False) -> str:
+        if command.startswith("info registers "):
+            reg_name = command.split()[-1]
+            raw = inferior.registers[reg_name]
+            return f"{reg_name:<15}{0:<19}(raw {int.from_bytes(raw, 'little'):#0{len(raw) * 2 + 2}x})\n"
+        return maint[command]
+
+    gdb.execute = execute
+    gdb.write = lambda text, stream=0: print(text, end="")
+    architecture = types.SimpleNamespace(name=lambda: "i386:x86-64")
+    gdb.selected_inferior = lambda: types.SimpleNamespace(architecture=lambda: architecture, read_memory=inferior.read_memory, threads=lambda: tuple(inferior.threads))
+    gdb.selected_frame = lambda: inferior.frame
+    gdb.newest_frame = lambda: inferior.frame
+    gdb.selected_thread = lambda: inferior.thread
+    return gdb
+
+
+def install(inferior: FakeInferior) -> None:
+    stubs = {
+        "gdb": _make_gdb(inferior),
+        "gef": types.SimpleNamespace(gdb=types.SimpleNamespace(commands={"context": ContextCommand()})),
+        "Color": Color,
+        "ContextCommand": ContextCommand,
+        "GenericCommand": GenericCommand,
+        "register": _passthrough,
+        "only_if_gdb_running": _passthrough,
+        "parse_arguments": _parse_arguments,
+        "register_external_command": lambda command: command,
+        "register_external_context_pane": _register_context_pane,
+        "get_terminal_size": lambda: (50, 160),
+        "info": print,
+        "err": print,
+    }
+    for name, value in stubs.items():
+        setattr(builtins, name, value)
+
+
+def load_extension(inferior: None | FakeInferior = None) -> types.ModuleType:
+    install(inferior or FakeInferior())
+    spec = importlib.util.spec_from_file_location("gef_pprint_register", EXTENSION_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def resume(inferior: FakeInferior, mutate: int = 4) -> None:
+    # Like gdb, cont fires before the inferior runs; hook-stop commands run after it and before the stop event.
+    builtins.gdb.events.cont.fire()
+    inferior.mutate(mutate)
+
+
+def stop(inferior: FakeInferior, mutate: int = 4) -> None:
+    resume(inferior, mutate)
+    builtins.gdb.events.stop.fire()
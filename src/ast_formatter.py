@@ -1,8 +1,46 @@
-import ast
 import enum
+import functools
+import math
+import mmap
+import re
+import struct
+import typing
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = [
+    "MemoryInfo",
+    "NotationInfo",
+    "PropertyInfo",
+    "ReadOnlySlots",
+    "RegisterDump",
+    "RegisterLaneDecoder",
+    "RegisterNotationError",
+    "RegisterNotationParser",
+    "RegisterNotationToken",
+    "RegisterPrintFormatter",
+    "RegisterPrintHook",
+    "RegisterTraceReader",
+    "RegisterTraceRecord",
+    "SliceInfo",
+    "apply_slice",
+]
+
+
+class ReadOnlySlots:
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value) -> None:
+        if hasattr(self, name):
+            raise AttributeError(f"{type(self).__name__}.{name} is read-only")
+        object.__setattr__(self, name, value)
+
+class NotationInfo(ReadOnlySlots):
+    __slots__ = ("radix", "unit")
 
-
-class NotationInfo:
     class NotationRadix(enum.Enum):
         Hexadecimal = "x"
         Octal = "o"
@@ -21,9 +59,10 @@ class NotationInfo:
         OWORD = 128
         YWORD = 256
         ZWORD = 512
+        DEFAULT = 0
 
     def __init__(
-        self, radix: NotationRadix = NotationRadix.Hexadecimal, unit=NotationUnit.DWORD
+        self, radix: NotationRadix = NotationRadix.Hexadecimal, unit=NotationUnit.DEFAULT
     ) -> None:
         self.radix = radix
         self.unit = unit
@@ -39,14 +78,15 @@ class NotationInfo:
         try:
             unit = NotationInfo.NotationUnit(unit_)
         except:
-            unit = NotationInfo.NotationUnit.DWORD
+            unit = NotationInfo.NotationUnit.DEFAULT
 
         return radix, unit
 
+class SliceInfo(ReadOnlySlots):
+    __slots__ = ("slice_from", "slice_to")
 
-class SliceInfo:
     class SliceRange(enum.Enum):
-        FROM_MSB = 1023
+        FROM_MSB = -1       # whole register, whatever its size
         TO_LSB = 0
 
     def __init__(
@@ -55,107 +95,409 @@ class SliceInfo:
         self.slice_from = slice_from
         self.slice_to = slice_to
 
+def apply_slice(val: int, slice: SliceInfo) -> int:
+    if slice.slice_from != SliceInfo.SliceRange.FROM_MSB:
+        val &= ((1 << slice.slice_from) - 1)
+    if slice.slice_to != SliceInfo.SliceRange.TO_LSB:
+        val >>= slice.slice_to
+    return val
+
+class PropertyInfo(ReadOnlySlots):
+    __slots__ = ("reg_name", "reg_slice")
 
-class PropertyInfo:
     def __init__(self, reg_name: str | None, reg_slice: SliceInfo) -> None:
         self.reg_name = reg_name
         self.reg_slice = reg_slice
 
+class MemoryInfo(ReadOnlySlots):
+    __slots__ = ("base", "mem_slice")
+
+    # `base` is an address, or the name of the register holding it. `mem_slice` is in bytes from it.
+    def __init__(self, base: int | str, mem_slice: SliceInfo) -> None:
+        self.base = base
+        self.mem_slice = mem_slice
+
+class RegisterDump(ReadOnlySlots):
+    __slots__ = ("reg_property", "reg_notation")
 
-class RegisterDump:
-    def __init__(self, reg_property: PropertyInfo, reg_notation: NotationInfo) -> None:
+    def __init__(self, reg_property: PropertyInfo | MemoryInfo, reg_notation: NotationInfo) -> None:
         self.reg_property = reg_property
         self.reg_notation = reg_notation
 
 
-class RegisterNotationASTVisitor(ast.NodeVisitor):
+class RegisterNotationError(TypeError):
+    def __init__(self, message: str, annotation: str, column: int) -> None:
+        super().__init__(f"{message} (column {column + 1})\n    {annotation}\n    {' ' * column}^")
+        self.message = message
+        self.annotation = annotation
+        self.column = column
+
+class RegisterNotationToken(enum.Enum):
+    NUMBER = "number"
+    NAME = "name"
+    DOLLAR = "$"
+    STAR = "*"
+    LPAREN = "("
+    RPAREN = ")"
+    LBRACKET = "["
+    RBRACKET = "]"
+    COLON = ":"
+    END = "end of notation"
+
+class RegisterNotationParser:
+    # notation := ('$'? NAME | '*' address) ('[' NUMBER? ':' NUMBER? ']')? (':' NAME)?
+    # address  := NUMBER | '$'? NAME | '(' '$'? NAME ')'
+    # Memory operands are sliced in bytes from the address, and also take '[' NUMBER ']' as a length.
+    _TOKEN_REGEX = re.compile(
+        r"(?P<NUMBER>0[xX][0-9a-fA-F]+|0[oO][0-7]+|0[bB][01]+|[0-9]+)"
+        r"|(?P<NAME>[A-Za-z_][A-Za-z0-9_]*)"
+        r"|(?P<PUNCT>[$*()\[\]:])"
+        r"|(?P<SPACE>\s+)"
+    )
+    _NOTATION_REGEX = re.compile(r"[A-Za-z][0-9]+")
+
+    def __init__(self, cache_size: int = 256) -> None:
+        self._compile = functools.lru_cache(maxsize=cache_size)(self._parse)
+
     def parse_register(self, annotation: str) -> RegisterDump:
-        reg_ast = ast.parse(annotation.strip("$"))
-        return self.visit_Module(reg_ast)
+        return self._compile(annotation)
+
+    def cache_info(self):
+        return self._compile.cache_info()
 
     def debug_print(self, dump: RegisterDump) -> None:
-        print(f"name        = {dump.reg_property.reg_name}")
-        print(f"slice.from  = {dump.reg_property.reg_slice.slice_from}")
-        print(f"slice.to    = {dump.reg_property.reg_slice.slice_to}")
+        if isinstance(dump.reg_property, MemoryInfo):
+            print(f"memory.base = {dump.reg_property.base}")
+            print(f"slice.from  = {dump.reg_property.mem_slice.slice_from}")
+            print(f"slice.to    = {dump.reg_property.mem_slice.slice_to}")
+        else:
+            print(f"name        = {dump.reg_property.reg_name}")
+            print(f"slice.from  = {dump.reg_property.reg_slice.slice_from}")
+            print(f"slice.to    = {dump.reg_property.reg_slice.slice_to}")
         print(f"type. radix = {dump.reg_notation.radix}")
         print(f"type. unit  = {dump.reg_notation.unit}")
 
-    def visit_Module(self, node: ast.Module) -> RegisterDump:
-        if isinstance(node.body[0], ast.Expr):
-            reg_property = self.visit_Expr(node.body[0])
-            return RegisterDump(reg_property, NotationInfo())
-        elif isinstance(node.body[0], ast.AnnAssign):
-            reg_property, reg_notation = self.visit_AnnAssign(node.body[0])
-            return RegisterDump(reg_property, reg_notation)
-        else:
-            raise TypeError("Unknown format of register notation")
-
-    def visit_Expr(self, node: ast.Expr) -> PropertyInfo:
-        if isinstance(node.value, ast.Name):
-            reg_name = self.visit_Name(node.value)
-            return PropertyInfo(reg_name, SliceInfo(SliceInfo.SliceRange.FROM_MSB, SliceInfo.SliceRange.TO_LSB))
-        elif isinstance(node.value, ast.Subscript):
-            reg_name, reg_slice = self.visit_Subscript(node.value)
-            return PropertyInfo(reg_name, reg_slice)
-        else:
-            raise TypeError("Unknown format of register property")
-
-    def visit_AnnAssign(self, node: ast.AnnAssign) -> tuple[PropertyInfo, NotationInfo]:
-        if isinstance(node.target, ast.Name):
-            reg_name = self.visit_Name(node.target)
-            
-            if not isinstance(node.annotation, ast.Name):
-                raise TypeError("Regiset annotation must be string constant")
-
-            radix, unit = NotationInfo.decode(self.visit_Name(node.annotation))
-            return PropertyInfo(reg_name, SliceInfo(SliceInfo.SliceRange.FROM_MSB, SliceInfo.SliceRange.TO_LSB)), NotationInfo(radix, unit)
-
-        elif isinstance(node.target, ast.Subscript):
-            reg_name, reg_slice = self.visit_Subscript(node.target)
-
-            if not isinstance(node.annotation, ast.Name):
-                raise TypeError("Register annotation must be string constant")
+    def tokenize(self, annotation: str) -> list[tuple[RegisterNotationToken, str, int]]:
+        tokens = []
+        pos = 0
+        while pos < len(annotation):
+            match = self._TOKEN_REGEX.match(annotation, pos)
+            if match is None:
+                raise RegisterNotationError(f"Unexpected character {annotation[pos]!r}", annotation, pos)
+            if match.lastgroup == "PUNCT":
+                tokens.append((RegisterNotationToken(match.group()), match.group(), pos))
+            elif match.lastgroup != "SPACE":
+                tokens.append((RegisterNotationToken[match.lastgroup], match.group(), pos))
+            pos = match.end()
+        tokens.append((RegisterNotationToken.END, "", len(annotation)))
+        return tokens
 
-            radix, unit = NotationInfo.decode(self.visit_Name(node.annotation))
-            return PropertyInfo(reg_name, reg_slice), NotationInfo(radix, unit)
+    @staticmethod
+    def _number(text: str) -> int:
+        return int(text, 0) if text[:2].lower() in ("0x", "0o", "0b") else int(text)
+
+    def _parse(self, annotation: str) -> RegisterDump:
+        tokens = self.tokenize(annotation)
+        pos = 0
+
+        def peek() -> RegisterNotationToken:
+            return tokens[pos][0]
+
+        def expect(kind: RegisterNotationToken) -> str:
+            nonlocal pos
+            token, text, column = tokens[pos]
+            if token != kind:
+                found = repr(text) if token != RegisterNotationToken.END else token.value
+                raise RegisterNotationError(f"Expected {kind.value}, found {found}", annotation, column)
+            pos += 1
+            return text
+
+        def register_name() -> str:
+            if peek() == RegisterNotationToken.DOLLAR:
+                expect(RegisterNotationToken.DOLLAR)
+            return expect(RegisterNotationToken.NAME)
+
+        memory_base = None
+        if peek() == RegisterNotationToken.STAR:
+            expect(RegisterNotationToken.STAR)
+            if peek() == RegisterNotationToken.NUMBER:
+                memory_base = self._number(expect(RegisterNotationToken.NUMBER))
+            elif peek() == RegisterNotationToken.LPAREN:
+                expect(RegisterNotationToken.LPAREN)
+                memory_base = register_name()
+                expect(RegisterNotationToken.RPAREN)
+            else:
+                memory_base = register_name()
         else:
-            raise TypeError("Unknown format of register property with notation")
-
-    def visit_Subscript(self, node: ast.Subscript) -> tuple[str, SliceInfo]:
-        if not isinstance(node.value, ast.Name):
-            raise TypeError("Register name must be string constant")
+            reg_name = register_name()
+
+        slice_from, slice_to = SliceInfo.SliceRange.FROM_MSB, SliceInfo.SliceRange.TO_LSB
+        if peek() == RegisterNotationToken.LBRACKET:
+            expect(RegisterNotationToken.LBRACKET)
+            column = tokens[pos][2]
+            if peek() == RegisterNotationToken.NUMBER:
+                slice_from = self._number(expect(RegisterNotationToken.NUMBER))
+            if memory_base is not None and slice_from != SliceInfo.SliceRange.FROM_MSB and peek() == RegisterNotationToken.RBRACKET:
+                slice_to = 0
+            else:
+                if peek() != RegisterNotationToken.COLON:
+                    raise RegisterNotationError("Register must be sliced with ':'", annotation, tokens[pos][2])
+                expect(RegisterNotationToken.COLON)
+                if peek() == RegisterNotationToken.NUMBER:
+                    slice_to = self._number(expect(RegisterNotationToken.NUMBER))
+            expect(RegisterNotationToken.RBRACKET)
+            if memory_base is not None:
+                if slice_from == SliceInfo.SliceRange.FROM_MSB:
+                    raise RegisterNotationError("Memory must be sliced with an end offset, e.g. [4096:0]", annotation, column)
+                if slice_to == SliceInfo.SliceRange.TO_LSB:
+                    slice_to = 0
+                if slice_from <= slice_to:
+                    raise RegisterNotationError("Memory slice end must be above its start, e.g. [4096:0]", annotation, column)
+
+        reg_notation = NotationInfo()
+        if peek() == RegisterNotationToken.COLON:
+            expect(RegisterNotationToken.COLON)
+            column = tokens[pos][2]
+            encoded = expect(RegisterNotationToken.NAME)
+            if self._NOTATION_REGEX.fullmatch(encoded) is None:
+                raise RegisterNotationError(f"Invalid notation {encoded!r}, expected radix and bit width (e.g. x64)", annotation, column)
+            reg_notation = NotationInfo(*NotationInfo.decode(encoded))
+
+        expect(RegisterNotationToken.END)
+        if memory_base is not None:
+            return RegisterDump(MemoryInfo(memory_base, SliceInfo(slice_from, slice_to)), reg_notation)
+        return RegisterDump(PropertyInfo(reg_name, SliceInfo(slice_from, slice_to)), reg_notation)
+
+
+class RegisterPrintHook:
+    def __init__(self, target_regex: str) -> None:
+        self.target = target_regex
+    
+    def print_register(reg_value: int):
+        pass
+
+
+class RegisterLaneDecoder:
+    # Lane widths beyond 64 bits have no struct code and are decoded with int.from_bytes instead.
+    _STRUCT_CODES = {
+        "unsigned": {8: "B", 16: "H", 32: "I", 64: "Q"},
+        "signed": {8: "b", 16: "h", 32: "i", 64: "q"},
+        "float": {16: "e", 32: "f", 64: "d"},
+    }
+    _NUMPY_DTYPES = {
+        "unsigned": {8: "<u1", 16: "<u2", 32: "<u4", 64: "<u8"},
+        "signed": {8: "<i1", 16: "<i2", 32: "<i4", 64: "<i8"},
+        "float": {16: "<f2", 32: "<f4", 64: "<f8"},
+    }
+    NUMPY_MIN_LANES = 256
 
-        reg_name = self.visit_Name(node.value)
+    @staticmethod
+    def lane_kind(radix: NotationInfo.NotationRadix) -> str:
+        if radix == NotationInfo.NotationRadix.SignedDecimal:
+            return "signed"
+        if radix == NotationInfo.NotationRadix.Float:
+            return "float"
+        return "unsigned"
 
-        if not isinstance(node.slice, ast.Slice):
-            raise TypeError("Register must be sliced")
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _struct(code: str, count: int) -> struct.Struct:
+        return struct.Struct(f"<{count}{code}")
+
+    def decode(self, radix: NotationInfo.NotationRadix, unit: int, raw: bytes | memoryview) -> tuple:
+        kind = self.lane_kind(radix)
+        step = unit // 8
+        count = len(raw) // step
+        code = self._STRUCT_CODES[kind].get(unit)
+        if code is None:
+            return tuple(
+                int.from_bytes(raw[off:off + step], "little", signed=(kind == "signed"))
+                for off in range(0, count * step, step)
+            )
+        if numpy is not None and count >= self.NUMPY_MIN_LANES:
+            return tuple(numpy.frombuffer(raw, dtype=self._NUMPY_DTYPES[kind][unit], count=count).tolist())
+        return self._struct(code, count).unpack_from(raw)
+
+
+class RegisterPrintFormatter:
+    def __init__(self, hooks: list[RegisterPrintHook]) -> None:
+        self._hooks = hooks
+        self._decoder = RegisterLaneDecoder()
+        self._compiled: dict[tuple[NotationInfo.NotationRadix, int], typing.Callable[[tuple], list]] = {}
 
-        slice_from, slice_to = self.visit_Slice(node.slice)
-        return reg_name, SliceInfo(slice_from, slice_to)
+    @staticmethod
+    def x87_extended(value: int) -> float:
+        mantissa = value & ((1 << 64) - 1)
+        exponent = (value >> 64) & 0x7fff
+        sign = -1.0 if (value >> 79) & 1 else 1.0
+        if exponent == 0x7fff:
+            return sign * math.inf if mantissa & ((1 << 63) - 1) == 0 else math.nan
+        try:
+            return sign * math.ldexp(mantissa, max(exponent, 1) - 16383 - 63)
+        except OverflowError:
+            return sign * math.inf
 
-    def visit_Slice(
-        self, node: ast.Slice
-    ) -> tuple[int | SliceInfo.SliceRange, int | SliceInfo.SliceRange]:
-        if isinstance(node.lower, ast.Constant):
-            slice_from = self.visit_Constant(node.lower)
+    @staticmethod
+    def character(value: int) -> str:
+        char = chr(value)
+        return char if char.isprintable() else f"\\x{value:02x}"
+
+    def lane_format(self, radix: NotationInfo.NotationRadix, unit: int) -> None | typing.Callable:
+        # Formats one lane already decoded by RegisterLaneDecoder: signed for `d`, float for `f`.
+        match (radix, unit):
+            case (NotationInfo.NotationRadix.Hexadecimal, _):
+                return f"{{:#0{(unit // 4) + 2}x}}".format
+            case (NotationInfo.NotationRadix.Octal, _):
+                return f"{{:#0{unit // 3 + 2}o}}".format
+            case (NotationInfo.NotationRadix.SignedDecimal, _):
+                return str
+            case (NotationInfo.NotationRadix.UnsignedDecimal, _):
+                return str
+            case (NotationInfo.NotationRadix.Binary, _):
+                return f"{{:#0{unit + 2}b}}".format
+            case (NotationInfo.NotationRadix.Float, 16 | 32 | 64):     # half, float, double
+                return str
+            case (NotationInfo.NotationRadix.Float, 80):                # x87 extended precision
+                return lambda value: str(self.x87_extended(value))
+            case (NotationInfo.NotationRadix.Character, NotationInfo.NotationUnit.BYTE): # char
+                return self.character
+            case _ : # Unsupported formats.
+                return None
+
+    def compile_notation(self, radix: NotationInfo.NotationRadix, unit: int) -> typing.Callable[[tuple], list]:
+        compiled = self._compiled.get((radix, unit))
+        if compiled is not None:
+            return compiled
+
+        lane_format = self.lane_format(radix, unit)
+        if lane_format is None:
+            compiled = lambda lanes: [None] * len(lanes)
+        elif unit == NotationInfo.NotationUnit.BYTE:
+            # Every possible byte lane is formatted once; negative `d8` lanes index from the end.
+            table = [lane_format(lane - 256 if radix == NotationInfo.NotationRadix.SignedDecimal and lane >= 128 else lane) for lane in range(256)]
+            compiled = lambda lanes: list(map(table.__getitem__, lanes))
         else:
-            slice_from = SliceInfo.SliceRange.FROM_MSB
+            compiled = lambda lanes: list(map(lane_format, lanes))
+        self._compiled[(radix, unit)] = compiled
+        return compiled
 
-        if isinstance(node.upper, ast.Constant):
-            slice_to = self.visit_Constant(node.upper)
+    def lane_bytes(self, unit: NotationInfo.NotationUnit, field_width: int, value: int) -> tuple[int, bytes]:
+        if unit != NotationInfo.NotationUnit.DEFAULT:
+            lanes = max(field_width // (unit // 8), 1)
         else:
-            slice_to = SliceInfo.SliceRange.TO_LSB
-
-        return slice_from, slice_to
-
-    def visit_Name(self, node: ast.Name) -> str:
-        return node.id
-
-    def visit_Constant(self, node: ast.Constant) -> int:
-        return node.value
-
+            unit, lanes = field_width * 8, 1
+        nbytes = lanes * (unit // 8)
+        return unit, (value & ((1 << (nbytes * 8)) - 1)).to_bytes(nbytes, "little")
+
+    def raw_lanes(self, radix: NotationInfo.NotationRadix, unit: int, raw: bytes | memoryview) -> tuple:
+        lanes = self._decoder.decode(radix, unit, raw)
+        if radix == NotationInfo.NotationRadix.Float and unit == NotationInfo.NotationUnit.TWORD:
+            return tuple(map(self.x87_extended, lanes))
+        return lanes
+
+    def lane_values(self, radix: NotationInfo.NotationRadix, unit: NotationInfo.NotationUnit, field_width: int, value: int) -> tuple[int, tuple]:
+        unit, raw = self.lane_bytes(unit, field_width, value)
+        return unit, self._decoder.decode(radix, unit, raw)
+
+    def string_by_unit_and_format(self, radix: NotationInfo.NotationRadix, unit: NotationInfo.NotationUnit, field_width: int, value: int):
+        unit, lanes = self.lane_values(radix, unit, field_width, value)
+        res = self.compile_notation(radix, unit)(lanes)
+        if len(res) == 1:
+            return res[0]
+        else:
+            return res
+
+    def changed_lanes(self, reg_notation: NotationInfo, field_width: int, value: None | int, prev_value: None | int) -> None | list[bool]:
+        if value is None or prev_value is None:
+            return None
+        _, lanes = self.lane_values(NotationInfo.NotationRadix.UnsignedDecimal, reg_notation.unit, field_width, value ^ prev_value)
+        return [lane != 0 for lane in lanes]
+
+    def string_register(self, reg_notation: NotationInfo, field_width: int, value: None | int) -> None | str:
+        if value is None:
+            return None
+        return self.string_by_unit_and_format(reg_notation.radix, reg_notation.unit, field_width, value)
+
+    def memory_rows(self, reg_notation: NotationInfo, address: int, raw: memoryview, row_bytes: int = 16, chunk_bytes: int = 1 << 16):
+        # Yields the (address, lanes) rows of one chunk at a time, so a large region is never formatted at once.
+        unit = reg_notation.unit or NotationInfo.NotationUnit.BYTE
+        step = unit // 8
+        lanes_per_row = max(row_bytes // step, 1)
+        chunk_bytes = max(chunk_bytes // (lanes_per_row * step), 1) * lanes_per_row * step
+        compiled = self.compile_notation(reg_notation.radix, unit)
+        for chunk_start in range(0, len(raw) - len(raw) % step, chunk_bytes):
+            lanes = compiled(self._decoder.decode(reg_notation.radix, unit, raw[chunk_start:chunk_start + chunk_bytes]))
+            yield [
+                (address + chunk_start + lane * step, lanes[lane:lane + lanes_per_row])
+                for lane in range(0, len(lanes), lanes_per_row)
+            ]
+
+
+class RegisterTraceReader:
+    # Reads the files written by `rezister --trace-start` (RegisterTraceWriter in gef_pprint_register.py).
+    MAGIC = b"REZTRC01"
+    HEADER = struct.Struct("<8sIIQH")
+    PC = struct.Struct("<Q")
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.header_size, self.record_size, record_count, reg_count = self.HEADER.unpack_from(self._mm)
+        if magic != self.MAGIC:
+            self.close()
+            raise ValueError(f"'{path}' is not a rezister trace")
+
+        self.layout: dict[str, tuple[int, int]] = {}
+        pos, offset = self.HEADER.size, self.PC.size
+        for _ in range(reg_count):
+            name_len = self._mm[pos]
+            name = bytes(self._mm[pos + 1:pos + 1 + name_len]).decode()
+            (size,) = struct.unpack_from("<H", self._mm, pos + 1 + name_len)
+            self.layout[name] = (offset, size)
+            pos += 3 + name_len
+            offset += size
+        # A trace cut short (gdb killed while recording) still has its preallocated tail.
+        self.record_count = min(record_count, (len(self._mm) - self.header_size) // self.record_size)
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def __enter__(self) -> "RegisterTraceReader":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def records(self, start: int = 0, stop: None | int = None):
+        # Each record is copied out of the map: a memoryview kept by the caller (the loop variable of
+        # `for step, pc, record in reader.records()`) would make close() fail with BufferError.
+        stop = self.record_count if stop is None else min(stop, self.record_count)
+        for step in range(start, stop):
+            base = self.header_size + step * self.record_size
+            record = self._mm[base:base + self.record_size]
+            yield step, self.PC.unpack_from(record)[0], RegisterTraceRecord(record, self.layout)
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+            self._file.close()
+
+class RegisterTraceRecord:
+    __slots__ = ("_record", "_layout")
+
+    def __init__(self, record: bytes, layout: dict[str, tuple[int, int]]) -> None:
+        self._record = record
+        self._layout = layout
+
+    def __contains__(self, reg_name: str) -> bool:
+        return reg_name in self._layout
+
+    def __getitem__(self, reg_name: str) -> bytes:
+        offset, size = self._layout[reg_name]
+        return self._record[offset:offset + size]
+
+    def get(self, reg_name: str, default=None):
+        return self[reg_name] if reg_name in self._layout else default
 
-if __name__ == "__main__":
-    RegNotASTVst = RegisterNotationASTVisitor()
-    test = RegNotASTVst.parse_register("$rdx[24:]:x64")
-    RegNotASTVst.debug_print(test)
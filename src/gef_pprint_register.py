@@ -1,193 +1,440 @@
-import ast
 import enum
+import hashlib
+import importlib.util
+import io
+import json
+import math
+import mmap
+import operator
+import os
 import re
 import struct
+import sys
+import time
+import typing
 
-class NotationInfo:
-    class NotationRadix(enum.Enum):
-        Hexadecimal = "x"
-        Octal = "o"
-        SignedDecimal = "d"
-        UnsignedDecimal = "u"
-        Binary = "b"
-        Float = "f"
-        Character = "c"
-
-    class NotationUnit(enum.IntEnum):
-        BYTE = 8
-        WORD = 16
-        DWORD = 32
-        QWORD = 64
-        OWORD = 128
-        YWORD = 256
-        ZWORD = 512
-        DEFAULT = 0
-
-    def __init__(
-        self, radix: NotationRadix = NotationRadix.Hexadecimal, unit=NotationUnit.DEFAULT
-    ) -> None:
-        self.radix = radix
-        self.unit = unit
+
+def _load_formatter():
+    # The notation, lane decoding and formatting half lives in ast_formatter.py, which must sit next to this file; it
+    # is shared with the gdb-free tools (tools/rezister_offline.py, benchmarks/). Loaded from its path under a name of
+    # our own, so gdb's sys.path is left alone and no other `ast_formatter` module can shadow it.
+    name = "gef_pprint_register_formatter"
+    if name in sys.modules:
+        return sys.modules[name]
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ast_formatter.py")
+    if not os.path.isfile(path):
+        raise ImportError(f"gef-pprint-register needs ast_formatter.py next to {os.path.basename(__file__)} ({path})")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+_formatter = _load_formatter()
+MemoryInfo = _formatter.MemoryInfo
+NotationInfo = _formatter.NotationInfo
+PropertyInfo = _formatter.PropertyInfo
+ReadOnlySlots = _formatter.ReadOnlySlots
+RegisterDump = _formatter.RegisterDump
+RegisterNotationError = _formatter.RegisterNotationError
+RegisterNotationParser = _formatter.RegisterNotationParser
+RegisterPrintFormatter = _formatter.RegisterPrintFormatter
+RegisterPrintHook = _formatter.RegisterPrintHook
+SliceInfo = _formatter.SliceInfo
+apply_slice = _formatter.apply_slice
+
+
+class RegisterFetchStrategy(enum.Enum):
+    RAW_BYTES = "raw"           # Value.bytes, whole register in one call
+    UNION_LANES = "lanes"       # widest <= 64-bit integer lane array of a vector union (gdb < 13)
+    SCALAR = "scalar"           # int(value) (gdb < 13)
+
+class RegisterInfo(ReadOnlySlots):
+    __slots__ = ("name", "number", "size", "type_name", "groups", "fetch", "lane_bits", "lane_path")
+
+    def __init__(self, name: str, number: int, size: int, type_name: str, groups: frozenset[str], fetch: RegisterFetchStrategy, lane_bits: int, lane_path: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.number = number
+        self.size = size
+        self.type_name = type_name
+        self.groups = groups
+        self.fetch = fetch
+        self.lane_bits = lane_bits
+        # Only read by the UNION_LANES fetch of gdb < 13; with Value.bytes the layout plays no part.
+        self.lane_path = lane_path  # fields leading to the widest <= 64-bit integer lane array, e.g. ("v2_int64",) or ("d", "u")
+
+class RegisterIndex:
+    MAX_LANE_BITS = 64  # gdb < 13 cannot int() anything wider, so v2_int128 / q.u lanes would read as None
+
+    def __init__(self, registers: None | list[RegisterInfo] = None) -> None:
+        registers = registers or []
+        self._registers = {reg.name: reg for reg in registers}
+        groups: dict[str, list[str]] = {}
+        for reg in registers:
+            for group in reg.groups:
+                groups.setdefault(group, []).append(reg.name)
+        self.groups: dict[str, tuple[str, ...]] = {group: tuple(names) for group, names in groups.items()}
+
+    @classmethod
+    def from_maint_output(cls, text: str, raw_bytes: bool = True) -> "RegisterIndex":
+        # Rows of `maint print register-groups`: Name Nr Rel Offset Size Type [Groups]
+        registers = []
+        for line in text.splitlines()[1:]:
+            fields = line.split()
+            if len(fields) < 6 or fields[0] == "''" or not fields[1].isdigit():
+                continue
+            name, number, size, type_name = fields[0], int(fields[1]), int(fields[4]), fields[5]
+            if size == 0:
+                continue
+            groups = frozenset(fields[6].split(",")) if len(fields) > 6 else frozenset()
+            vector = "vector" in groups or "sse" in groups or type_name.startswith("vec")
+            if raw_bytes:
+                fetch = RegisterFetchStrategy.RAW_BYTES
+            elif vector:
+                fetch = RegisterFetchStrategy.UNION_LANES
+            else:
+                fetch = RegisterFetchStrategy.SCALAR
+            lane_bits = 64 if vector and size > 8 else size * 8
+            registers.append(RegisterInfo(name, number, size, type_name, groups, fetch, lane_bits))
+        return cls(registers)
 
     @staticmethod
-    def decode(encoded: str) -> tuple[NotationRadix, NotationUnit]:
-        radix_, unit_ = encoded[0], int(encoded[1:])
+    def integer_lanes(reg_type, path: tuple[str, ...] = ()) -> None | tuple[tuple[str, ...], int]:
+        # Widest integer array of at most 64-bit lanes among the (nested) union members: v2_int64 / v4_int64 /
+        # v8_int64 of x86 vec128 / vec256 / vec512, d.u of AArch64 NEON / SVE.
+        reg_type = reg_type.strip_typedefs()
+        if reg_type.code == gdb.TYPE_CODE_ARRAY:
+            target = reg_type.target().strip_typedefs()
+            if target.code != gdb.TYPE_CODE_INT or target.sizeof * 8 > RegisterIndex.MAX_LANE_BITS:
+                return None
+            return path, target.sizeof * 8
+        if reg_type.code != gdb.TYPE_CODE_UNION:
+            return None
+        widest = None
+        for field in reg_type.fields():
+            found = RegisterIndex.integer_lanes(field.type, path + (field.name,))
+            if found is not None and (widest is None or found[1] > widest[1]):
+                widest = found
+        return widest
+
+    def with_type_layouts(self, read_type) -> "RegisterIndex":
+        # gdb < 13: lane layouts come from each wide register's gdb.Type, so no architecture needs hand-written
+        # field names for the UNION_LANES fetch.
+        registers = []
+        for reg in self:
+            found = None
+            if reg.size > 8:
+                try:
+                    found = self.integer_lanes(read_type(reg.name))
+                except (ValueError, gdb.error):
+                    pass
+            if found is None:
+                registers.append(reg)
+                continue
+            lane_path, lane_bits = found
+            registers.append(RegisterInfo(reg.name, reg.number, reg.size, reg.type_name, reg.groups, RegisterFetchStrategy.UNION_LANES, lane_bits, lane_path))
+        return RegisterIndex(registers)
+
+    def __getitem__(self, reg_name: str) -> RegisterInfo:
+        return self._registers[reg_name]
+
+    def __contains__(self, reg_name: str) -> bool:
+        return reg_name in self._registers
+
+    def __iter__(self):
+        return iter(self._registers.values())
+
+    def __len__(self) -> int:
+        return len(self._registers)
+
+    def get(self, reg_name: str, default: None | RegisterInfo = None) -> None | RegisterInfo:
+        return self._registers.get(reg_name, default)
+
+
+class RegisterIndexCache:
+    VERSION = 2
+
+    def __init__(self, directory: str) -> None:
+        self.directory = directory
+
+    def key(self, arch_name: str, tdesc: str, raw_bytes: bool) -> str:
+        digest = hashlib.sha1(tdesc.encode()).hexdigest()[:16]
+        return f"{re.sub(r'[^A-Za-z0-9_.-]', '_', arch_name)}-{digest}-{'raw' if raw_bytes else 'lanes'}"
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"registers-{key}.json")
+
+    def load(self, key: str) -> None | RegisterIndex:
+        if not self.directory:
+            return None
         try:
-            radix = NotationInfo.NotationRadix(radix_)
-        except:
-            radix = NotationInfo.NotationRadix.Hexadecimal
+            with open(self.path(key)) as cache_file:
+                cached = json.load(cache_file)
+            if cached["version"] != self.VERSION:
+                return None
+            return RegisterIndex([
+                RegisterInfo(name, number, size, type_name, frozenset(groups), RegisterFetchStrategy(fetch), lane_bits, tuple(lane_path))
+                for name, number, size, type_name, groups, fetch, lane_bits, lane_path in cached["registers"]
+            ])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
 
+    def store(self, key: str, index: RegisterIndex) -> None:
+        if not self.directory:
+            return
+        cached = {
+            "version": self.VERSION,
+            "registers": [
+                [reg.name, reg.number, reg.size, reg.type_name, sorted(reg.groups), reg.fetch.value, reg.lane_bits, list(reg.lane_path)]
+                for reg in index
+            ],
+        }
         try:
-            unit = NotationInfo.NotationUnit(unit_)
-        except:
-            unit = NotationInfo.NotationUnit.DEFAULT
-
-        return radix, unit
-
-class SliceInfo:
-    class SliceRange(enum.Enum):
-        FROM_MSB = 1023
-        TO_LSB = 0
-
-    def __init__(
-        self, slice_from: int | SliceRange, slice_to: int | SliceRange
-    ) -> None:
-        self.slice_from = slice_from
-        self.slice_to = slice_to
-
-class PropertyInfo:
-    def __init__(self, reg_name: str | None, reg_slice: SliceInfo) -> None:
-        self.reg_name = reg_name
-        self.reg_slice = reg_slice
-
-class RegisterDump:
-    def __init__(self, reg_property: PropertyInfo, reg_notation: NotationInfo) -> None:
-        self.reg_property = reg_property
-        self.reg_notation = reg_notation
-
-
-class RegisterNotationASTVisitor(ast.NodeVisitor):
-    def parse_register(self, annotation: str) -> RegisterDump:
-        reg_ast = ast.parse(annotation.strip("$"))
-        return self.visit_Module(reg_ast)
-
-    def debug_print(self, dump: RegisterDump) -> None:
-        print(f"name        = {dump.reg_property.reg_name}")
-        print(f"slice.from  = {dump.reg_property.reg_slice.slice_from}")
-        print(f"slice.to    = {dump.reg_property.reg_slice.slice_to}")
-        print(f"type. radix = {dump.reg_notation.radix}")
-        print(f"type. unit  = {dump.reg_notation.unit}")
-
-    def visit_Module(self, node: ast.Module) -> RegisterDump:
-        if isinstance(node.body[0], ast.Expr):
-            reg_property = self.visit_Expr(node.body[0])
-            return RegisterDump(reg_property, NotationInfo())
-        elif isinstance(node.body[0], ast.AnnAssign):
-            reg_property, reg_notation = self.visit_AnnAssign(node.body[0])
-            return RegisterDump(reg_property, reg_notation)
-        else:
-            raise TypeError("Unknown format of register notation")
-
-    def visit_Expr(self, node: ast.Expr) -> PropertyInfo:
-        if isinstance(node.value, ast.Name):
-            reg_name = self.visit_Name(node.value)
-            return PropertyInfo(reg_name, SliceInfo(SliceInfo.SliceRange.FROM_MSB, SliceInfo.SliceRange.TO_LSB))
-        elif isinstance(node.value, ast.Subscript):
-            reg_name, reg_slice = self.visit_Subscript(node.value)
-            return PropertyInfo(reg_name, reg_slice)
-        else:
-            raise TypeError("Unknown format of register property")
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self.path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as cache_file:
+                json.dump(cached, cache_file)
+            os.replace(tmp_path, self.path(key))
+        except OSError:
+            pass
+
+
+class RegisterSnapshot:
+    def __init__(self, fetch) -> None:
+        self._fetch = fetch
+        self._values: dict[str, None | bytes] = {}
+        self._context = None
+        self._connected = False
+        self.hits = 0
+        self.misses = 0
 
-    def visit_AnnAssign(self, node: ast.AnnAssign) -> tuple[PropertyInfo, NotationInfo]:
-        if isinstance(node.target, ast.Name):
-            reg_name = self.visit_Name(node.target)
-            
-            if not isinstance(node.annotation, ast.Name):
-                raise TypeError("Register annotation must be string constant")
+    def connect(self) -> None:
+        if self._connected:
+            return
+        gdb.events.stop.connect(self.invalidate)
+        gdb.events.cont.connect(self.invalidate)
+        gdb.events.exited.connect(self.invalidate)
+        gdb.events.memory_changed.connect(self.invalidate)
+        gdb.events.register_changed.connect(self.invalidate)
+        self._connected = True
 
-            radix, unit = NotationInfo.decode(self.visit_Name(node.annotation))
-            return PropertyInfo(reg_name, SliceInfo(SliceInfo.SliceRange.FROM_MSB, SliceInfo.SliceRange.TO_LSB)), NotationInfo(radix, unit)
+    def invalidate(self, *_) -> None:
+        self._values.clear()
+        self._context = None
 
-        elif isinstance(node.target, ast.Subscript):
-            reg_name, reg_slice = self.visit_Subscript(node.target)
+    def _current_context(self) -> tuple:
+        # `thread N` and `frame N` fire no event, so key the snapshot on where we are instead.
+        thread = gdb.selected_thread()
+        return (thread.global_num if thread is not None else None, gdb.selected_frame())
 
-            if not isinstance(node.annotation, ast.Name):
-                raise TypeError("Register annotation must be string constant")
+    def _sync_context(self):
+        context = self._current_context()
+        if context != self._context:
+            self._values.clear()
+            self._context = context
+        return context[1]
 
-            radix, unit = NotationInfo.decode(self.visit_Name(node.annotation))
-            return PropertyInfo(reg_name, reg_slice), NotationInfo(radix, unit)
+    def get(self, reg_name: str) -> None | bytes:
+        frame = self._sync_context()
+        if reg_name not in self._values:
+            self.misses += 1
+            self._values[reg_name] = self._fetch(reg_name, frame)
         else:
-            raise TypeError("Unknown format of register property with notation")
+            self.hits += 1
+        return self._values[reg_name]
 
-    def visit_Subscript(self, node: ast.Subscript) -> tuple[str, SliceInfo]:
-        if not isinstance(node.value, ast.Name):
-            raise TypeError("Register name must be string constant")
+    def get_many(self, reg_names) -> dict[str, None | bytes]:
+        frame = self._sync_context()
+        for reg_name in reg_names:
+            if reg_name not in self._values:
+                self.misses += 1
+                self._values[reg_name] = self._fetch(reg_name, frame)
+            else:
+                self.hits += 1
+        return {reg_name: self._values[reg_name] for reg_name in reg_names}
 
-        reg_name = self.visit_Name(node.value)
 
-        if not isinstance(node.slice, ast.Slice):
-            raise TypeError("Register must be sliced")
+class RegisterHistory:
+    def __init__(self, snapshot: RegisterSnapshot, depth: int = 32) -> None:
+        self.snapshot = snapshot
+        self.depth = depth
+        self.stop_count = 0
+        self._ring: list[dict[str, None | bytes]] = [{} for _ in range(depth)]
+        self._tracked: dict[str, None] = {}
+        self._connected = False
+        self._resumed = False
+        self.paused = False  # set while a trace records the stops, so tracked registers are not read twice
+        self.hits = 0
+        self.misses = 0
 
-        slice_from, slice_to = self.visit_Slice(node.slice)
-        return reg_name, SliceInfo(slice_from, slice_to)
+    def connect(self) -> None:
+        if self._connected:
+            return
+        # Connected after the snapshot, so its invalidation runs first on the same events.
+        gdb.events.cont.connect(self.on_resume)
+        gdb.events.stop.connect(self.on_stop)
+        gdb.events.register_changed.connect(self.record)
+        self._connected = True
 
-    def visit_Slice(
-        self, node: ast.Slice
-    ) -> tuple[int | SliceInfo.SliceRange, int | SliceInfo.SliceRange]:
-        if isinstance(node.lower, ast.Constant):
-            slice_from = self.visit_Constant(node.lower)
-        else:
-            slice_from = SliceInfo.SliceRange.FROM_MSB
+    def resize(self, depth: int) -> None:
+        # --since needs the current stop and at least one before it; clamp first so a smaller
+        # setting does not compare unequal to the clamped depth and clear the ring on every call.
+        depth = max(depth, 2)
+        if depth != self.depth:
+            self.depth = depth
+            self._ring = [{} for _ in range(self.depth)]
 
-        if isinstance(node.upper, ast.Constant):
-            slice_to = self.visit_Constant(node.upper)
-        else:
-            slice_to = SliceInfo.SliceRange.TO_LSB
+    def on_resume(self, *_) -> None:
+        # hook-stop runs before the stop observers, so the next slot is opened by the first use after a resume,
+        # not by on_stop. gdb may resume several times (stepping over breakpoints) for one stop.
+        self._resumed = True
 
-        return slice_from, slice_to
+    def advance(self) -> None:
+        if self._resumed:
+            self._resumed = False
+            self.stop_count += 1
+            self._ring[self.stop_count % self.depth] = {}
 
-    def visit_Name(self, node: ast.Name) -> str:
-        return node.id
+    def track(self, reg_name: str) -> None:
+        if reg_name not in self._tracked:
+            self._tracked[reg_name] = None
+            self.remember(reg_name)
 
-    def visit_Constant(self, node: ast.Constant) -> int:
-        return node.value
+    def remember(self, reg_name: str) -> None:
+        # Keep the value at this stop only: group dumps use it so a register printed by `rez --all`
+        # is not read again at every later stop.
+        self.advance()
+        self._ring[self.stop_count % self.depth][reg_name] = self.snapshot.get(reg_name)
 
-class RegisterRetrieveHook:
-    def __init__(self, target_regex: str, hook, length = 1) -> None:
-        self.target = target_regex
-        self.hook = hook
-        self.len = length
+    def on_stop(self, *_) -> None:
+        self.record()
+
+    def record(self, *_) -> None:
+        self.advance()
+        if self._tracked and not self.paused:
+            self._ring[self.stop_count % self.depth].update(self.snapshot.get_many(self._tracked))
+
+    def get(self, reg_name: str, since: int = 0) -> None | bytes:
+        self.advance()
+        if since < 0 or since >= self.depth or since > self.stop_count:
+            self.misses += 1
+            return None
+        raw = self._ring[(self.stop_count - since) % self.depth].get(reg_name)
+        if raw is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return raw
 
 
 class RegisterValueRetriever:
-    def __init__(self, hooks: list[RegisterRetrieveHook]) -> None:
-        self._hooks = hooks
+    _VALUE_HAS_BYTES = hasattr(gdb.Value, "bytes")
+    # Types int() returns the bits of; for floats (st0-st7, AArch64 d/s views) it converts the value instead.
+    _INTEGER_TYPE_CODES = frozenset((
+        gdb.TYPE_CODE_INT, gdb.TYPE_CODE_FLAGS, gdb.TYPE_CODE_ENUM,
+        gdb.TYPE_CODE_PTR, gdb.TYPE_CODE_BOOL, gdb.TYPE_CODE_CHAR,
+    ))
+    _INFO_REGISTERS_RAW_REGEX = re.compile(r"\(raw (0x[0-9A-Fa-f]+)\)")
+
+    def __init__(self) -> None:
+        self.snapshot = RegisterSnapshot(self.fetch_bytes)
+        self.history = RegisterHistory(self.snapshot)
+        self.index = RegisterIndex()
+        self.gdb_reads = 0
     
-    def apply_slice(self, val: int, slice: SliceInfo):
-        if slice.slice_from != SliceInfo.SliceRange.FROM_MSB:
-            val &= ((1 << slice.slice_from) - 1)
-        if slice.slice_to != SliceInfo.SliceRange.TO_LSB:
-            val >>= slice.slice_to
-        return val        
+    apply_slice = staticmethod(apply_slice)
+
+    def fetch_bytes(self, reg_name: str, frame=None) -> None | bytes:
+        info = self.index.get(reg_name)
+        self.gdb_reads += 1
+        try:
+            reg = (frame or gdb.selected_frame()).read_register(reg_name)
+            if reg.type.code == gdb.TYPE_CODE_VOID:
+                return None
+            if info is None:
+                return reg.bytes if self._VALUE_HAS_BYTES else self._bytes_from_fields(reg_name, reg)
+            if info.fetch == RegisterFetchStrategy.RAW_BYTES:
+                return reg.bytes
+            if info.fetch == RegisterFetchStrategy.UNION_LANES and info.lane_path:
+                return self._bytes_from_lanes(reg, info)
+            return self._bytes_from_fields(reg_name, reg)
+        except (ValueError, gdb.error):
+            return None
+
+    @staticmethod
+    def _lane_bytes(reg, lane_path: tuple[str, ...], lane_bits: int, size: int) -> bytes:
+        lanes = reg
+        for field in lane_path:
+            lanes = lanes[field]
+        lane_size = lane_bits // 8
+        mask = (1 << lane_bits) - 1
+        return b"".join((int(lanes[idx]) & mask).to_bytes(lane_size, "little") for idx in range(size // lane_size))
+
+    @staticmethod
+    def _bytes_from_lanes(reg, info: RegisterInfo) -> bytes:
+        return RegisterValueRetriever._lane_bytes(reg, info.lane_path, info.lane_bits, info.size)
+
+    def _bytes_from_fields(self, reg_name: str, reg) -> None | bytes:
+        # gdb < 13 has no Value.bytes: assemble from the integer lanes RegisterIndex.integer_lanes picks for the type.
+        size = reg.type.sizeof
+        found = RegisterIndex.integer_lanes(reg.type)
+        if found is not None:
+            lane_path, lane_bits = found
+            return self._lane_bytes(reg, lane_path, lane_bits, size)
+        if reg.type.strip_typedefs().code in self._INTEGER_TYPE_CODES:
+            return (int(reg) & ((1 << (8 * size)) - 1)).to_bytes(size, "little")
+        return self._bytes_from_info_registers(reg_name, size)
+
+    def _bytes_from_info_registers(self, reg_name: str, size: int) -> None | bytes:
+        # Floats and other non-integer registers: `info registers` prints their bits as `(raw 0x...)`, most
+        # significant byte first. It reads the selected frame, which is the one every fetch_bytes caller passes.
+        output = gdb.execute(f"info registers {reg_name}", to_string=True)
+        match = self._INFO_REGISTERS_RAW_REGEX.search(output)
+        if match is None:
+            return None
+        return int(match.group(1), 16).to_bytes(size, "little")
 
     def retrieve_value(self, prop: PropertyInfo) -> None | int:
-        for hook in self._hooks:
-            if re.findall(hook.target, prop.reg_name) != []:
-                reg = gdb.parse_and_eval('$' + hook.hook(prop.reg_name))
-                if reg.type.code == gdb.TYPE_CODE_VOID:
-                    return None
-                else:
-                    res = 0
-                    for idx in range(hook.len):
-                        res |= (int(reg[idx]) << (64 * idx))
-                    return self.apply_slice(res, prop.reg_slice)
-        reg = gdb.parse_and_eval('$' + prop.reg_name)
-        if reg.type.code == gdb.TYPE_CODE_VOID:
+        raw = self.snapshot.get(prop.reg_name)
+        if raw is None:
             return None
+        return self.apply_slice(int.from_bytes(raw, "little"), prop.reg_slice)
+
+    def register_width(self, reg_name: str) -> int:
+        # Registers missing from the index (added by the target description) are as wide as their bytes; 0 when unreadable.
+        reg_info = self.index.get(reg_name)
+        if reg_info is not None:
+            return reg_info.size
+        return len(self.snapshot.get(reg_name) or b"")
+
+    def memory_range(self, memory: MemoryInfo, reg_notation: NotationInfo) -> None | tuple[int, int]:
+        if isinstance(memory.base, int):
+            address = memory.base
         else:
-            return self.apply_slice(int(reg), prop.reg_slice)
+            raw = self.snapshot.get(memory.base)
+            if raw is None:
+                return None
+            address = int.from_bytes(raw, "little")
+        if memory.mem_slice.slice_from == SliceInfo.SliceRange.FROM_MSB:
+            return address, (reg_notation.unit or NotationInfo.NotationUnit.BYTE) // 8
+        return address + memory.mem_slice.slice_to, memory.mem_slice.slice_from - memory.mem_slice.slice_to
 
-    def retrieve_prev_value(self, prop: PropertyInfo) -> None | int:
+    def read_memory(self, address: int, length: int) -> None | memoryview:
+        # One read for the whole region; the Membuf is decoded in place, never copied into bytes.
+        self.gdb_reads += 1
+        try:
+            return memoryview(gdb.selected_inferior().read_memory(address, length))
+        except (ValueError, OverflowError, gdb.error):
+            return None
+
+    def retrieve_prev_value(self, prop: PropertyInfo, since: int = 1) -> None | int:
+        raw = self.history.get(prop.reg_name, since)
+        if raw is not None:
+            return self.apply_slice(int.from_bytes(raw, "little"), prop.reg_slice)
+        if since != 1:
+            return None
+        # Not tracked at the previous stop yet: fall back to what GEF's context recorded.
         ctx_cmd = gef.gdb.commands["context"]
         assert isinstance(ctx_cmd, ContextCommand)
         old_reg = ctx_cmd.old_registers.get('$' + prop.reg_name)
@@ -196,27 +443,6 @@ class RegisterValueRetriever:
         else:
             return self.apply_slice(int(old_reg), prop.reg_slice)
 
-class RegisterSizeIndex:
-    def __init__(self, regex: str, size) -> None:
-        self.regex = regex
-        self.size = size
-
-class RegisterSizeDictionary:
-    def __init__(self, indices: list[RegisterSizeIndex]) -> None:
-        self.indices = indices
-
-    def __getitem__(self, target: str):
-        for ind in self.indices:
-            if re.findall(ind.regex, target) != []:
-                return ind.size
-        
-class RegisterPrintHook:
-    def __init__(self, target_regex: str) -> None:
-        self.target = target_regex
-    
-    def print_register(reg_value: int):
-        pass
-
 class EFLAGSRegisterPrintHook(RegisterPrintHook):
     def __init__(self, target_regex: str) -> None:
         super().__init__(target_regex)
@@ -225,137 +451,1060 @@ class EFLAGSRegisterPrintHook(RegisterPrintHook):
         pass
 
 
-class RegisterPrintFormatter:
-    def __init__(self, hooks: list[RegisterPrintHook]) -> None:
-        self._hooks = hooks
+class _ProfiledStage:
+    __slots__ = ("_timing", "_start")
+
+    def __init__(self, timing: list[int]) -> None:
+        self._timing = timing
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter_ns()
+
+    def __exit__(self, *_) -> None:
+        self._timing[0] += 1
+        self._timing[1] += time.perf_counter_ns() - self._start
+
+class _UnprofiledStage:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *_) -> None:
+        pass
+
+class RegisterProfiler:
+    STAGES = ("index", "parse", "fetch", "format", "diff", "colorize", "print")
+    _UNPROFILED = _UnprofiledStage()
+
+    def __init__(self, parser: RegisterNotationParser, retriever: RegisterValueRetriever) -> None:
+        self.parser = parser
+        self.retriever = retriever
+        self.enabled = False
+        self.reset()
+
+    def reset(self) -> None:
+        self.timings = {stage: [0, 0] for stage in self.STAGES}
+        self.gdb_executes = 0
+        self.retriever.gdb_reads = 0
+        self.retriever.snapshot.hits = self.retriever.snapshot.misses = 0
+        self.retriever.history.hits = self.retriever.history.misses = 0
+        self._parse_base = self.parser.cache_info()
+
+    def stage(self, name: str):
+        if not self.enabled:
+            return self._UNPROFILED
+        return _ProfiledStage(self.timings[name])
+
+    def counters(self) -> dict[str, int]:
+        cache = self.parser.cache_info()
+        return {
+            "gdb_reads": self.retriever.gdb_reads,
+            "gdb_executes": self.gdb_executes,
+            "parse_hits": cache.hits - self._parse_base.hits,
+            "parse_misses": cache.misses - self._parse_base.misses,
+            "snapshot_hits": self.retriever.snapshot.hits,
+            "snapshot_misses": self.retriever.snapshot.misses,
+            "history_hits": self.retriever.history.hits,
+            "history_misses": self.retriever.history.misses,
+        }
+
+    def totals(self) -> tuple[dict[str, tuple[int, int]], dict[str, int]]:
+        return {stage: tuple(timing) for stage, timing in self.timings.items()}, self.counters()
+
+    def report(self, since: None | tuple[dict[str, tuple[int, int]], dict[str, int]] = None) -> list[str]:
+        timings, counters = self.totals()
+        if since is not None:
+            timings = {stage: (calls - since[0][stage][0], ns - since[0][stage][1]) for stage, (calls, ns) in timings.items()}
+            counters = {name: value - since[1][name] for name, value in counters.items()}
+
+        ratio = lambda hits, misses: f"{hits} hits / {misses} misses ({100 * hits / (hits + misses) if hits + misses else 0:.1f}%)"
+        lines = [f"{'stage':<10} {'calls':>8} {'total':>12} {'mean':>12}"]
+        for stage, (calls, ns) in timings.items():
+            if calls:
+                lines.append(f"{stage:<10} {calls:>8} {ns / 1e6:>10.3f}ms {ns / calls / 1e3:>10.2f}us")
+        total_ns = sum(ns for _, ns in timings.values())
+        lines.append(f"{'total':<10} {'':>8} {total_ns / 1e6:>10.3f}ms")
+        lines.append(f"gdb round trips : {counters['gdb_reads'] + counters['gdb_executes']} (read_register {counters['gdb_reads']}, execute {counters['gdb_executes']})")
+        lines.append(f"parser cache    : {ratio(counters['parse_hits'], counters['parse_misses'])}")
+        lines.append(f"snapshot        : {ratio(counters['snapshot_hits'], counters['snapshot_misses'])}")
+        lines.append(f"history         : {ratio(counters['history_hits'], counters['history_misses'])}")
+        return lines
 
-    def formatted_value(self, radix: NotationInfo.NotationRadix, unit: NotationInfo.NotationUnit, value: int):
-        match (radix, unit):
-            case (NotationInfo.NotationRadix.Hexadecimal, _):
-                return f"{value:#0{(unit // 4) + 2}x}"
-            case (NotationInfo.NotationRadix.Octal, _):
-                return f"{value:#0{unit // 3 + 2}o}"
-            case (NotationInfo.NotationRadix.SignedDecimal, _):
-                if value >= (1 << (unit - 1)):
-                    return str(-(value ^ ((1 << unit) - 1)))
-                else:
-                    return str(value)
-            case (NotationInfo.NotationRadix.UnsignedDecimal, _):
-                return str(value)
-            case (NotationInfo.NotationRadix.Binary, _):
-                return f"{value:#0{unit + 2}b}"
-            case (NotationInfo.NotationRadix.Float, NotationInfo.NotationUnit.WORD):    # bfloat (16bit)
-                return struct.unpack("e", int.to_bytes(value, 2, "little"))[0]
-            case (NotationInfo.NotationRadix.Float, NotationInfo.NotationUnit.DWORD):   # float (32bit)
-                return struct.unpack("f", int.to_bytes(value, 4, "little"))[0]
-            case (NotationInfo.NotationRadix.Float, NotationInfo.NotationUnit.QWORD):    # bfloat (64bit)
-                return struct.unpack("d", int.to_bytes(value, 8, "little"))[0]
-            case (NotationInfo.NotationRadix.Character, NotationInfo.NotationUnit.BYTE): # char
-                pass
-            case _ : # Unsupported formats.
-                return
 
+class RegisterTraceWriter:
+    # header  : magic, header size, record size, record count, register count
+    # registers: (u8 name length, name, u16 byte size) per register
+    # records : u64 pc, then every register's raw little-endian bytes in header order
+    MAGIC = b"REZTRC01"
+    HEADER = struct.Struct("<8sIIQH")
+    PC = struct.Struct("<Q")
+    CHUNK_RECORDS = 4096
 
-    def string_by_unit_and_format(self, radix: NotationInfo.NotationRadix, unit: NotationInfo.NotationUnit, field_width: int, value: int):
-        if unit != NotationInfo.NotationUnit.DEFAULT:
-            res = []
-            for _ in range(max(field_width // (unit // 8), 1)):
-                res.append(value & ((1 << unit) - 1))
-                value >>= unit
-            res = [self.formatted_value(radix, unit, v) for v in res]
-            if len(res) == 1:
-                return res[0]
+    def __init__(self, path: str, registers: list[tuple[str, int]]) -> None:
+        self.path = path
+        self.registers = registers
+        self.record_size = self.PC.size + sum(size for _, size in registers)
+        self.record_count = 0
+        layout = b"".join(
+            struct.pack("<B", len(name)) + name.encode() + struct.pack("<H", size)
+            for name, size in registers
+        )
+        self.header_size = self.HEADER.size + len(layout)
+        self._offsets = []
+        offset = self.PC.size
+        for _, size in registers:
+            self._offsets.append((offset, size))
+            offset += size
+
+        self._file = open(path, "w+b")
+        self._file.write(self.HEADER.pack(self.MAGIC, self.header_size, self.record_size, 0, len(registers)) + layout)
+        self._capacity = 0
+        self._mm = None
+        self._grow()
+
+    def _grow(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+        self._capacity += self.CHUNK_RECORDS
+        self._file.truncate(self.header_size + self._capacity * self.record_size)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    def append(self, pc: int, blobs: list[None | bytes]) -> None:
+        if self.record_count == self._capacity:
+            self._grow()
+        mm = self._mm
+        base = self.header_size + self.record_count * self.record_size
+        self.PC.pack_into(mm, base, pc)
+        for (offset, size), blob in zip(self._offsets, blobs):
+            start = base + offset
+            if blob is None:
+                mm[start:start + size] = bytes(size)
+            elif len(blob) == size:
+                mm[start:start + size] = blob
             else:
-                return res
-        else:
-            return self.formatted_value(radix, field_width * 8, value)
+                mm[start:start + size] = blob[:size].ljust(size, b"\x00")
+        self.record_count += 1
+        struct.pack_into("<Q", mm, 16, self.record_count)
 
-    def string_register(self, reg_notation: NotationInfo, field_width: int, value: None | int) -> None | str:
-        if value is None:
+    def close(self) -> None:
+        if self._mm is None:
+            return
+        self._mm.flush()
+        self._mm.close()
+        self._mm = None
+        self._file.truncate(self.header_size + self.record_count * self.record_size)
+        self._file.close()
+
+
+class RegisterTraceRecorder:
+    def __init__(self, snapshot: RegisterSnapshot) -> None:
+        self.snapshot = snapshot
+        self.writer: None | RegisterTraceWriter = None
+        self._reg_names: tuple[str, ...] = ()
+
+    @property
+    def recording(self) -> bool:
+        return self.writer is not None
+
+    def start(self, path: str, registers: list[tuple[str, int]]) -> None:
+        self.stop()
+        self.writer = RegisterTraceWriter(path, registers)
+        self._reg_names = tuple(name for name, _ in registers)
+        gdb.events.stop.connect(self.on_stop)
+        self.on_stop()
+
+    def stop(self) -> None | RegisterTraceWriter:
+        writer = self.writer
+        if writer is None:
             return None
-        return self.string_by_unit_and_format(reg_notation.radix, reg_notation.unit, field_width, value)
+        gdb.events.stop.disconnect(self.on_stop)
+        writer.close()
+        self.writer = None
+        return writer
+
+    def on_stop(self, *_) -> None:
+        values = self.snapshot.get_many(self._reg_names)
+        self.writer.append(gdb.selected_frame().pc(), [values[name] for name in self._reg_names])
+
+
+class LaneVector(tuple):
+    # Lane-wise operators over Python ints / floats, as numpy arrays have, so predicates compare whole registers.
+    def _lanewise(op, reflected=False):
+        def method(self, other):
+            if isinstance(other, tuple):
+                pairs = zip(other, self) if reflected else zip(self, other)
+                return LaneVector(op(a, b) for a, b in pairs)
+            return LaneVector(op(other, lane) if reflected else op(lane, other) for lane in self)
+        return method
+
+    __eq__ = _lanewise(operator.eq)
+    __ne__ = _lanewise(operator.ne)
+    __lt__ = _lanewise(operator.lt)
+    __le__ = _lanewise(operator.le)
+    __gt__ = _lanewise(operator.gt)
+    __ge__ = _lanewise(operator.ge)
+    __add__, __radd__ = _lanewise(operator.add), _lanewise(operator.add, True)
+    __sub__, __rsub__ = _lanewise(operator.sub), _lanewise(operator.sub, True)
+    __mul__, __rmul__ = _lanewise(operator.mul), _lanewise(operator.mul, True)
+    __and__, __rand__ = _lanewise(operator.and_), _lanewise(operator.and_, True)
+    __or__, __ror__ = _lanewise(operator.or_), _lanewise(operator.or_, True)
+    __xor__, __rxor__ = _lanewise(operator.xor), _lanewise(operator.xor, True)
+    __lshift__, __rlshift__ = _lanewise(operator.lshift), _lanewise(operator.lshift, True)
+    __rshift__, __rrshift__ = _lanewise(operator.rshift), _lanewise(operator.rshift, True)
+    __hash__ = tuple.__hash__
+    del _lanewise
+
+    def __neg__(self) -> "LaneVector":
+        return LaneVector(-lane for lane in self)
+
+    def __invert__(self) -> "LaneVector":
+        return LaneVector(~lane for lane in self)
+
+    def __abs__(self) -> "LaneVector":
+        return LaneVector(abs(lane) for lane in self)
+
+    def __bool__(self) -> bool:
+        return all(self)
+
+
+class RegisterPredicate:
+    # Register operands of the predicate are rezister notations; the rest is a Python expression over their lanes.
+    _OPERAND_REGEX = re.compile(r"\$[A-Za-z_][A-Za-z0-9_]*(?:\[[^\]]*\])?(?::[A-Za-z][0-9]+)?")
+
+    def __init__(self, source: str, parser: RegisterNotationParser, sizes: typing.Callable[[str], None | int]) -> None:
+        # sizes(reg_name) is the register's byte size, 0 for no such register, or None when it cannot be known yet
+        # (no process, and not in the exec file's register table): that operand is sized at its first read.
+        self.source = source
+        operands: dict[str, str] = {}
+        expression = self._OPERAND_REGEX.sub(lambda match: operands.setdefault(match.group(), f"_lanes{len(operands)}"), source)
+        if len(operands) == 0:
+            raise RegisterNotationError("Predicate has no register operand (e.g. $xmm0:f32)", source, 0)
+        self._code = compile(expression, "<rezister-break>", "eval")
+
+        self._formatter = RegisterPrintFormatter([])
+        self._operands: list[tuple[str, str, typing.Callable[[bytes], typing.Any]]] = []
+        for text, variable in operands.items():
+            parsed = parser.parse_register(text)
+            size = sizes(parsed.reg_property.reg_name)
+            if size == 0:
+                raise RegisterNotationError(f"Unknown register '{parsed.reg_property.reg_name}'", source, source.index(text))
+            decode = self.lane_decoder(parsed, size) if size is not None else self.sized_lane_decoder(parsed)
+            self._operands.append((variable, parsed.reg_property.reg_name, decode))
+        self.reg_names = list(dict.fromkeys(reg_name for _, reg_name, _ in self._operands))
+        self._globals = {
+            "__builtins__": {},
+            "any": any, "all": all,
+            "abs": abs, "len": len, "min": min, "max": max, "sum": sum,
+            "math": math, "nan": math.nan, "inf": math.inf,
+        }
+
+    def lane_decoder(self, parsed: RegisterDump, size: int) -> typing.Callable[[bytes], LaneVector]:
+        # Same lanes as `rezister` prints, but only as many as the slice covers. Always Python ints / floats
+        # (x87_extended for f80), decoded as `rezister` prints them, so integer arithmetic never wraps.
+        reg_slice, notation = parsed.reg_property.reg_slice, parsed.reg_notation
+        low = 0 if reg_slice.slice_to == SliceInfo.SliceRange.TO_LSB else reg_slice.slice_to
+        high = size * 8 if reg_slice.slice_from == SliceInfo.SliceRange.FROM_MSB else min(reg_slice.slice_from, size * 8)
+        width = max(high - low, 1)
+        unit = notation.unit or (width + 7) // 8 * 8
+        count = max((width + 7) // 8 // (unit // 8), 1)
+        nbytes = count * unit // 8
+
+        if low % 8 == 0 and high % 8 == 0:
+            def extract(raw: bytes) -> bytes:
+                return raw[low // 8:high // 8].ljust(nbytes, b"\0")[:nbytes]
+        else:
+            mask = (1 << width) - 1
+            def extract(raw: bytes) -> bytes:
+                return ((int.from_bytes(raw, "little") >> low) & mask).to_bytes(nbytes, "little")
+
+        return lambda raw: LaneVector(self._formatter.raw_lanes(notation.radix, unit, extract(raw)))
+
+    def sized_lane_decoder(self, parsed: RegisterDump) -> typing.Callable[[bytes], LaneVector]:
+        decoders: dict[int, typing.Callable[[bytes], LaneVector]] = {}
+
+        def decode(raw: bytes) -> LaneVector:
+            if len(raw) not in decoders:
+                decoders[len(raw)] = self.lane_decoder(parsed, len(raw))
+            return decoders[len(raw)](raw)
+        return decode
+
+    def evaluate(self, fetch: typing.Callable[[str], None | bytes]) -> bool:
+        # One read per register, however many operands slice or reinterpret it.
+        raws = {}
+        for reg_name in self.reg_names:
+            raws[reg_name] = fetch(reg_name)
+            if raws[reg_name] is None:
+                raise ValueError(f"Register '{reg_name}' is unavailable")
+        namespace = {variable: decode(raws[reg_name]) for variable, reg_name, decode in self._operands}
+        return bool(eval(self._code, self._globals, namespace))
+
+
+class RegisterPredicateBreakpoint(gdb.Breakpoint):
+    def __init__(self, location: str, predicate: RegisterPredicate, retriever: "RegisterValueRetriever") -> None:
+        super().__init__(location)
+        self.predicate = predicate
+        self.retriever = retriever
+        self.evaluations = 0
+        self.stop_count = 0
+
+    def stop(self) -> bool:
+        # Runs on every hit, before gdb's stop events: read straight from the frame, not the per-stop snapshot.
+        self.evaluations += 1
+        frame = gdb.selected_frame()
+        try:
+            stop = self.predicate.evaluate(lambda reg_name: self.retriever.fetch_bytes(reg_name, frame))
+        except Exception as error:
+            err(f"rezister-break {self.number}: {error}")
+            stop = True
+        self.stop_count += stop
+        return stop
+
+
+class RegisterRenderer:
+    # Output of one command goes to a single buffer and leaves with one gdb.write().
+    COLLAPSE_MIN_RUN = 3
+
+    def __init__(self) -> None:
+        self._buffer = io.StringIO()
+        self._column = 0
+        self._segments: dict[str, tuple[str, str]] = {}
+        self.width = 0
+        self.lane_budget = 0
+
+    def begin(self, width: int, lane_budget: int) -> None:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._column = 0
+        self._segments.clear()
+        self.width = width
+        self.lane_budget = lane_budget
+
+    def segment(self, attrs: str) -> tuple[str, str]:
+        # The escape sequences around any text in `attrs`, taken from Color once instead of per lane.
+        segment = self._segments.get(attrs)
+        if segment is None:
+            prefix, _, suffix = Color.colorify("\0", attrs).partition("\0")
+            segment = self._segments[attrs] = (prefix, suffix)
+        return segment
+
+    def paint(self, text: str, attrs: str) -> str:
+        prefix, suffix = self.segment(attrs)
+        return f"{prefix}{text}{suffix}"
+
+    def collapse(self, strings: list, changed: list[bool]) -> list[tuple[str, bool]]:
+        lanes = [(str(string), chg) for string, chg in zip(strings, changed)]
+        if self.lane_budget <= 0 or len(lanes) <= self.lane_budget:
+            return lanes
+        collapsed = []
+        idx = 0
+        while idx < len(lanes):
+            end = idx + 1
+            while end < len(lanes) and lanes[end] == lanes[idx]:
+                end += 1
+            if end - idx >= self.COLLAPSE_MIN_RUN:
+                collapsed.append((f"{lanes[idx][0]} \u00d7{end - idx}", lanes[idx][1]))
+            else:
+                collapsed.extend(lanes[idx:end])
+            idx = end
+        return collapsed
+
+    def format_value(self, curr_string, changed: None | list[bool], column: int = 0, wrap: bool = True, collapse: bool = True) -> str:
+        if not isinstance(curr_string, list):
+            return self.paint(str(curr_string), "yellow bold" if changed and any(changed) else "yellow")
+        changed = changed or [False] * len(curr_string)
+        lanes = self.collapse(curr_string, changed) if collapse else [(str(string), chg) for string, chg in zip(curr_string, changed)]
+        plain, bold = self.segment("yellow"), self.segment("yellow bold")
+        width = self.width if wrap else 0
+        out = ["["]
+        col = column + 1
+        for idx, (text, chg) in enumerate(lanes):
+            if idx:
+                if width and col + len(text) + 3 > width:
+                    out.append(",\n" + " " * (column + 1))
+                    col = column + 1
+                else:
+                    out.append(", ")
+                    col += 2
+            prefix, suffix = bold if chg else plain
+            out.append(prefix)
+            out.append(text)
+            out.append(suffix)
+            col += len(text)
+        out.append("]")
+        return "".join(out)
+
+    def text(self, text: str, attrs: None | str = None) -> None:
+        self._buffer.write(self.paint(text, attrs) if attrs else text)
+        newline = text.rfind("\n")
+        self._column = len(text) - newline - 1 if newline >= 0 else self._column + len(text)
+
+    def value(self, curr_string, changed: None | list[bool]) -> None:
+        self.write(self.format_value(curr_string, changed, self._column))
+
+    def write(self, rendered: str) -> None:
+        # Already colored text: the column is no longer tracked, so only a newline may follow.
+        self._buffer.write(rendered)
+
+    def newline(self) -> None:
+        self._buffer.write("\n")
+        self._column = 0
+
+    def flush(self) -> None:
+        output = self._buffer.getvalue()
+        if output:
+            gdb.write(output)
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._column = 0
 
 
 @register
 class ExtendedRegisterCommand(GenericCommand):
     _cmdline_: str = "rezister"
     _syntax_: str = (
-        f"{_cmdline_} {{Register[Bytes]:{{Format}}}} ... {{Register[Bytes]:{{Format}}}}"
+        f"{_cmdline_} [--since N] [--all-threads] [--format text|jsonl|raw [--output FILE]] [--trace-start FILE | --trace-stop] [--{{group}} ...] {{Register[Bytes]:{{Format}}}} ... {{Register[Bytes]:{{Format}}}}"
     )
-    _example_: str = f"\n{_cmdline_} $rax" f"\n{_cmdline_} $rsp[3:]:u32"
+    _example_: str = f"\n{_cmdline_} $rax" f"\n{_cmdline_} $rsp[3:]:u32" f"\n{_cmdline_} --sse --general" f"\n{_cmdline_} --since 5 $ymm2:f32" f"\n{_cmdline_} *($rdi)[4096:0]:f32" f"\n{_cmdline_} --all-threads $xmm5:f32" f"\n{_cmdline_} --format jsonl $ymm0:f32 $rax" f"\n{_cmdline_} --trace-start /tmp/ymm.trace $ymm0 $ymm1"
     __doc__: str = "Register(including SIMD) formatted pretty-print extension."
 
-    if not isinstance(gef.arch, X86_64):
-        raise gdb.error("Only available on X86-64 architecture")
-
-    _reg_sizes_ = {}
-    _reg_groups_ = []
+    # Group flags are added in place: parse_arguments builds its parser from this dict on every call.
+    _optional_arguments_: dict[str, bool | int | str] = {"--since": 1, "--trace-start": "", "--trace-stop": False, "--profile": False, "--all-threads": False, "--format": "text", "--output": ""}
+    _reg_group_notations_ = {
+        "general": "x64",
+        "float": "x80",
+        "system": "x64",
+        "mmx": "x64",
+        "sse": "f32",
+        "vector": "f32",
+    }
+    _reg_group_default_notation_ = "x64"
 
-    _RegisterASTVisitor = RegisterNotationASTVisitor()
-    _RegisterValueRetriever = RegisterValueRetriever([
-        RegisterRetrieveHook("xmm[0-9]+", lambda xmm: xmm + ".v2_int64", 2),
-        RegisterRetrieveHook("ymm[0-9]+", lambda ymm: ymm + ".v4_int64", 4)
-    ])
+    _RegisterNotationParser = RegisterNotationParser()
+    _RegisterValueRetriever = RegisterValueRetriever()
+    _RegisterTraceRecorder = RegisterTraceRecorder(_RegisterValueRetriever.snapshot)
+    _RegisterProfiler = RegisterProfiler(_RegisterNotationParser, _RegisterValueRetriever)
+    _RegisterIndexCache = RegisterIndexCache(
+        os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "gef-pprint-register")
+    )
 
     _RegisterPrintFormatter = RegisterPrintFormatter([
         EFLAGSRegisterPrintHook("eflags")
     ])
+    _RegisterRenderer = RegisterRenderer()
+    _vector_length: None | bytes = None
+
+    def __init__(self) -> None:
+        super().__init__()
+        self["register_cache"] = (self._RegisterIndexCache.directory, "Directory caching parsed register tables per target description (empty to disable)")
+        self["history_depth"] = (self._RegisterValueRetriever.history.depth, "Number of stops kept in the register history (for --since)")
+        self["profile"] = (False, "Always accumulate per-stage timings for `rezister stats` (as --profile does for one call)")
+        self["lane_budget"] = (32, "Values with more lanes than this print runs of 3 or more equal lanes as `lane \u00d7count` (0 to disable)")
+        self["context_expressions"] = ("", "Space separated expressions pinned to the `rezister` context pane (add it to context.layout)")
+        self._RegisterValueRetriever.snapshot.connect()
+        self._RegisterValueRetriever.history.connect()
+        self._record_outputs: dict[tuple[str, bool], typing.IO] = {}
+        gdb.events.exited.connect(self.close_record_outputs)
+        gdb.events.new_objfile.connect(self.reset_register_index)
+        gdb.events.clear_objfiles.connect(self.reset_register_index)
+        self.update_group_flags(
+            group.split()[0]
+            for group in gdb.execute("maint print reggroups", to_string=True).splitlines()[1:]
+            if group.strip()
+        )
+
+    def reset_register_index(self, *_) -> None:
+        self._RegisterValueRetriever.index = RegisterIndex()
+
+    def load_register_index(self) -> RegisterIndex:
+        self._RegisterIndexCache.directory = self["register_cache"]
+        raw_bytes = RegisterValueRetriever._VALUE_HAS_BYTES
+        self._RegisterProfiler.gdb_executes += 1
+        try:
+            tdesc = gdb.execute("maint print xml-tdesc", to_string=True)
+        except gdb.error:
+            tdesc = ""
+        key = self._RegisterIndexCache.key(gdb.selected_inferior().architecture().name(), tdesc, raw_bytes)
+        index = self._RegisterIndexCache.load(key)
+        if index is None:
+            self._RegisterProfiler.gdb_executes += 1
+            index = RegisterIndex.from_maint_output(gdb.execute("maint print register-groups", to_string=True), raw_bytes)
+            if not raw_bytes:
+                try:
+                    frame = gdb.selected_frame()
+                except gdb.error:
+                    # No process yet: no layouts, and nothing cached; the table is built again on `run`.
+                    return index
+                index = index.with_type_layouts(lambda reg_name: frame.read_register(reg_name).type)
+            self._RegisterIndexCache.store(key, index)
+        return index
+
+    def vector_length(self) -> None | bytes:
+        # AArch64 SVE: `vg` (vector length in 64-bit granules) can change at runtime, resizing every z and p register.
+        retriever = self._RegisterValueRetriever
+        if "vg" not in retriever.index or gdb.selected_thread() is None:
+            return None
+        return retriever.snapshot.get("vg")
+
+    def ensure_register_index(self) -> None:
+        retriever = self._RegisterValueRetriever
+        if len(retriever.index) != 0 and self.vector_length() != self._vector_length:
+            self.reset_register_index()
+        if len(retriever.index) == 0:
+            with self._RegisterProfiler.stage("index"):
+                retriever.index = self.load_register_index()
+            self._vector_length = self.vector_length()
+            self.update_group_flags(retriever.index.groups)
+
+    def update_group_flags(self, groups) -> None:
+        for group in groups:
+            self._optional_arguments_.setdefault(f"--{group}", False)
+
+    def colorize(self, curr_string, changed: None | list[bool]) -> str:
+        return self._RegisterRenderer.format_value(curr_string, changed, wrap=False)
+
+    def begin_render(self) -> RegisterRenderer:
+        renderer = self._RegisterRenderer
+        renderer.begin(get_terminal_size()[1], self["lane_budget"])
+        return renderer
+
+    def dump_register(self, parsed: RegisterDump, since: int = 1, track: bool = True) -> bool:
+        # Returns False, printing nothing, when the register cannot be read: the caller reports it.
+        retriever = self._RegisterValueRetriever
+        profiler = self._RegisterProfiler
+        with profiler.stage("fetch"):
+            if track:
+                retriever.history.track(parsed.reg_property.reg_name)
+            else:
+                retriever.history.remember(parsed.reg_property.reg_name)
+            curr_value = retriever.retrieve_value(parsed.reg_property)
+            prev_value = retriever.retrieve_prev_value(parsed.reg_property, since)
+            field_width = retriever.register_width(parsed.reg_property.reg_name)
+        if curr_value is None:
+            return False
+        with profiler.stage("format"):
+            curr_string = self._RegisterPrintFormatter.string_register(parsed.reg_notation, field_width, curr_value)
+        with profiler.stage("diff"):
+            changed = self._RegisterPrintFormatter.changed_lanes(parsed.reg_notation, field_width, curr_value, prev_value)
+        with profiler.stage("colorize"):
+            self._RegisterRenderer.value(curr_string, changed)
+        return True
+
+    def dump_memory(self, parsed: RegisterDump) -> None:
+        retriever = self._RegisterValueRetriever
+        profiler = self._RegisterProfiler
+        with profiler.stage("fetch"):
+            memory_range = retriever.memory_range(parsed.reg_property, parsed.reg_notation)
+            if memory_range is None:
+                err(f"Unknown register '{parsed.reg_property.base}'")
+                return
+            address, length = memory_range
+            raw = retriever.read_memory(address, length)
+            if raw is None:
+                err(f"Cannot access memory at {address:#x} ({length} bytes)")
+                return
+
+        renderer = self._RegisterRenderer
+        renderer.flush()
+        rows = self._RegisterPrintFormatter.memory_rows(parsed.reg_notation, address, raw)
+        while True:
+            with profiler.stage("format"):
+                chunk = next(rows, None)
+            if chunk is None:
+                break
+            with profiler.stage("colorize"):
+                for row_address, lanes in chunk:
+                    renderer.text(f"{row_address:#x}", "blue")
+                    renderer.text(" : ")
+                    renderer.text(", ".join(map(str, lanes)), "yellow")
+                    renderer.newline()
+            with profiler.stage("print"):
+                renderer.flush()
+
+    def group_registers(self, group: str) -> list[tuple[str, RegisterDump]]:
+        index = self._RegisterValueRetriever.index
+        reg_names = sorted(index.groups.get(group, ()), key=lambda name: index[name].number)
+        with self._RegisterProfiler.stage("fetch"):
+            self._RegisterValueRetriever.snapshot.get_many(reg_names)
+
+        notation = self._reg_group_notations_.get(group, self._reg_group_default_notation_)
+        radix, unit = notation[0], int(notation[1:])
+        with self._RegisterProfiler.stage("parse"):
+            return [
+                (name, self._RegisterNotationParser.parse_register(f"{name}:{self.group_notation(index[name], radix, unit)}"))
+                for name in reg_names
+            ]
+
+    @staticmethod
+    def group_notation(reg: RegisterInfo, radix: str, unit: int) -> str:
+        # Vector groups also hold control and mask registers (mxcsr, k0-k7, fpsr): those are not float lanes.
+        if radix == "f" and reg.size <= 8 and not reg.type_name.startswith("vec"):
+            return f"x{reg.size * 8}"
+        return f"{radix}{min(unit, reg.size * 8)}"
+
+    def dump_group(self, group: str, since: int = 1) -> None:
+        registers = self.group_registers(group)
+        if len(registers) == 0:
+            return
+        width = max(len(name) for name, _ in registers)
+        renderer = self._RegisterRenderer
+        renderer.text(f"[{group}]", "blue")
+        renderer.newline()
+        for name, parsed in registers:
+            renderer.text(f"{name:<{width}} : ")
+            if not self.dump_register(parsed, since, track=False):
+                renderer.text("unavailable", "red")
+            renderer.newline()
+
+    def fetch_threads(self, reg_names: list[str]) -> list[tuple[typing.Any, dict[str, None | bytes]]]:
+        # One switch per thread and one back; the snapshot is keyed on the selected thread, so read frames directly.
+        retriever = self._RegisterValueRetriever
+        selected_thread, selected_frame = gdb.selected_thread(), gdb.selected_frame()
+        rows = []
+        try:
+            for thread in sorted(gdb.selected_inferior().threads(), key=lambda thread: thread.num):
+                if not thread.is_valid() or thread.is_running():
+                    continue
+                thread.switch()
+                frame = gdb.newest_frame()
+                rows.append((thread, {reg_name: retriever.fetch_bytes(reg_name, frame) for reg_name in reg_names}))
+        finally:
+            selected_thread.switch()
+            selected_frame.select()
+        return rows
+
+    def dump_threads(self, expressions: list[str]) -> None:
+        profiler = self._RegisterProfiler
+        retriever = self._RegisterValueRetriever
+        formatter = self._RegisterPrintFormatter
+        dumps = []
+        for reg in expressions:
+            with profiler.stage("parse"):
+                parsed = self._RegisterNotationParser.parse_register(reg)
+            if isinstance(parsed.reg_property, MemoryInfo):
+                err(f"Memory is shared by all threads: '{reg}'")
+                continue
+            dumps.append((reg, parsed))
+        if len(dumps) == 0:
+            return
+
+        with profiler.stage("fetch"):
+            rows = self.fetch_threads(list(dict.fromkeys(parsed.reg_property.reg_name for _, parsed in dumps)))
+        if len(rows) == 0:
+            err("No stopped thread")
+            return
+
+        selected = gdb.selected_thread().num
+        labels = [f"{'*' if thread.num == selected else ' '}{thread.num} (LWP {thread.ptid[1]})" for thread, _ in rows]
+        # Cells are (plain, colored) pairs: the plain text is what the column is aligned on.
+        columns = [[(label, label) for label in ["  Thread"] + labels]]
+        for reg, parsed in dumps:
+            reg_name, reg_slice = parsed.reg_property.reg_name, parsed.reg_property.reg_slice
+            reg_info = retriever.index.get(reg_name)
+            raws = [values[reg_name] for _, values in rows]
+            field_width = reg_info.size if reg_info is not None else max(len(raw or b"") for raw in raws)
+            values = [None if raw is None else retriever.apply_slice(int.from_bytes(raw, "little"), reg_slice) for raw in raws]
+            with profiler.stage("format"):
+                strings = [formatter.string_register(parsed.reg_notation, field_width, value) for value in values]
+            with profiler.stage("diff"):
+                # A lane is highlighted in every row when any thread disagrees with the first one on it.
+                differs = None
+                reference = next((value for value in values if value is not None), None)
+                for value in values:
+                    changed = formatter.changed_lanes(parsed.reg_notation, field_width, value, reference)
+                    if changed is not None:
+                        differs = changed if differs is None else [a or b for a, b in zip(differs, changed)]
+            with profiler.stage("colorize"):
+                cells = []
+                for string in strings:
+                    plain = f"[{', '.join(map(str, string))}]" if isinstance(string, list) else str(string)
+                    cells.append((plain, self._RegisterRenderer.format_value(string, differs, wrap=False, collapse=False)))
+            columns.append([(reg, reg)] + cells)
+
+        with profiler.stage("print"):
+            widths = [max(len(plain) for plain, _ in column) for column in columns]
+            gdb.write("".join(
+                "  ".join(
+                    colored + " " * (width - len(plain))
+                    for (plain, colored), width in ((column[row], width) for column, width in zip(columns, widths))
+                ).rstrip() + "\n"
+                for row in range(len(rows) + 1)
+            ))
+
+    def start_trace(self, path: str, expressions: list[str]) -> None:
+        registers = []
+        for reg in expressions:
+            reg_property = self._RegisterNotationParser.parse_register(reg).reg_property
+            if isinstance(reg_property, MemoryInfo):
+                err(f"Memory operands cannot be traced: '{reg}'")
+                return
+            reg_name = reg_property.reg_name
+            size = self._RegisterValueRetriever.register_width(reg_name)
+            if size == 0:
+                err(f"Unknown register '{reg_name}'")
+                return
+            if reg_name not in dict(registers):
+                registers.append((reg_name, size))
+        if len(registers) == 0:
+            err("No register to trace")
+            return
+        self._RegisterTraceRecorder.start(path, registers)
+        self._RegisterValueRetriever.history.paused = True
+        info(f"Tracing {', '.join(name for name, _ in registers)} to '{path}'")
+
+    def stop_trace(self) -> None:
+        writer = self._RegisterTraceRecorder.stop()
+        self._RegisterValueRetriever.history.paused = False
+        if writer is None:
+            err("No trace is being recorded")
+            return
+        info(f"Recorded {writer.record_count} stops ({writer.record_size} bytes each) to '{writer.path}'")
+
+    def register_record(self, expr: str, parsed: RegisterDump, since: int, binary: bool, track: bool = True) -> None | bytes | str:
+        retriever = self._RegisterValueRetriever
+        formatter = self._RegisterPrintFormatter
+        profiler = self._RegisterProfiler
+        prop, notation = parsed.reg_property, parsed.reg_notation
+        with profiler.stage("fetch"):
+            if track:
+                retriever.history.track(prop.reg_name)
+            else:
+                retriever.history.remember(prop.reg_name)
+            value = retriever.retrieve_value(prop)
+            prev_value = None if binary else retriever.retrieve_prev_value(prop, since)
+            field_width = retriever.register_width(prop.reg_name)
+        if value is None:
+            err(f"Unknown register '{prop.reg_name}'")
+            return None
+        unit, raw = formatter.lane_bytes(notation.unit, field_width, value)
+        if binary:
+            return raw
+        with profiler.stage("diff"):
+            changed = formatter.changed_lanes(notation, field_width, value, prev_value)
+        with profiler.stage("format"):
+            reg_slice = prop.reg_slice
+            return json.dumps({
+                "expr": expr,
+                "register": prop.reg_name,
+                "slice": [
+                    None if reg_slice.slice_from == SliceInfo.SliceRange.FROM_MSB else reg_slice.slice_from,
+                    None if reg_slice.slice_to == SliceInfo.SliceRange.TO_LSB else reg_slice.slice_to,
+                ],
+                "notation": f"{notation.radix.value}{unit}",
+                "lanes": self.json_lanes(formatter.raw_lanes(notation.radix, unit, raw)),
+                "changed": changed,
+            }, separators=(",", ":"))
+
+    def memory_record(self, expr: str, parsed: RegisterDump, binary: bool) -> None | bytes | str:
+        retriever = self._RegisterValueRetriever
+        notation = parsed.reg_notation
+        with self._RegisterProfiler.stage("fetch"):
+            memory_range = retriever.memory_range(parsed.reg_property, notation)
+            if memory_range is None:
+                err(f"Unknown register '{parsed.reg_property.base}'")
+                return None
+            address, length = memory_range
+            raw = retriever.read_memory(address, length)
+        if raw is None:
+            err(f"Cannot access memory at {address:#x} ({length} bytes)")
+            return None
+        if binary:
+            return bytes(raw)
+        unit = notation.unit or NotationInfo.NotationUnit.BYTE
+        with self._RegisterProfiler.stage("format"):
+            return json.dumps({
+                "expr": expr,
+                "address": address,
+                "length": length,
+                "notation": f"{notation.radix.value}{unit}",
+                "lanes": self.json_lanes(self._RegisterPrintFormatter.raw_lanes(notation.radix, unit, raw)),
+            }, separators=(",", ":"))
+
+    @staticmethod
+    def json_lanes(lanes: tuple) -> list:
+        # JSON has no NaN or infinities: those lanes are written as the strings "nan", "inf" and "-inf".
+        return [str(lane) if isinstance(lane, float) and not math.isfinite(lane) else lane for lane in lanes]
+
+    def record_output(self, path: str, binary: bool):
+        # Kept open across calls (e.g. from a hook-stop), so a pipe reader sees one continuous stream.
+        stream = self._record_outputs.get((path, binary))
+        if stream is None or stream.closed:
+            stream = self._record_outputs[(path, binary)] = open(path, "ab" if binary else "a")
+        return stream
+
+    def close_record_outputs(self, *_) -> None:
+        for stream in self._record_outputs.values():
+            stream.close()
+        self._record_outputs.clear()
+
+    def dump_records(self, expressions: list[tuple[str, RegisterDump]], fmt: str, output: str, since: int = 1, group_expressions: None | list[tuple[str, RegisterDump]] = None) -> None:
+        if fmt not in ("jsonl", "raw"):
+            err(f"Unknown format '{fmt}', expected text, jsonl or raw")
+            return
+        binary = fmt == "raw"
+        if binary and not output:
+            err("--format=raw writes bytes: give a file or pipe with --output")
+            return
+        records = []
+        for expr, parsed in expressions:
+            if isinstance(parsed.reg_property, MemoryInfo):
+                record = self.memory_record(expr, parsed, binary)
+            else:
+                record = self.register_record(expr, parsed, since, binary)
+            if record is not None:
+                records.append(record)
+        for expr, parsed in group_expressions or ():
+            record = self.register_record(expr, parsed, since, binary, track=False)
+            if record is not None:
+                records.append(record)
+
+        with self._RegisterProfiler.stage("print"):
+            data = b"".join(records) if binary else "".join(f"{record}\n" for record in records)
+            if not output:
+                gdb.write(data)
+                return
+            try:
+                stream = self.record_output(output, binary)
+                stream.write(data)
+                stream.flush()
+            except OSError as error:
+                err(f"Cannot write to '{output}': {error}")
+
+    def print_stats(self, argv: list[str]) -> None:
+        if argv[1:] == ["reset"]:
+            self._RegisterProfiler.reset()
+            info("rezister counters reset")
+            return
+        print("\n".join(self._RegisterProfiler.report()))
 
     @only_if_gdb_running
-    @parse_arguments(
-        {"registers": [""]}, {f"--{groupname}": False for groupname in _reg_groups_}
-    )
+    @parse_arguments({"registers": [""]}, _optional_arguments_)
     def do_invoke(self, argv, **kwargs):
         args = kwargs["arguments"]
-        if len(self._reg_sizes_) == 0:
-            self._reg_sizes_ = {
-                reg.split()[0]: int(reg.split()[4])
-                for reg in gdb.execute("maint print registers", to_string=True).splitlines()[
-                    1:-1
-                ] if reg.split()[0] != "''"
-            }
-        
-        if len(self._reg_groups_) == 0:
-            self._reg_groups_ = [
-                group.split()[0]
-                for group in gdb.execute("maint print reggroups", to_string=True).splitlines()[
-                    1:
-                ]
-            ]
+        if args.registers[:1] == ["stats"]:
+            self.print_stats(args.registers)
+            return
 
-        if args.registers != ['']:
+        profiler = self._RegisterProfiler
+        profiler.enabled = args.profile or self["profile"]
+        before = profiler.totals() if args.profile else None
+        try:
+            self.dump(args)
+        finally:
+            profiler.enabled = self["profile"]
+        if before is not None:
+            print("\n".join(profiler.report(before)))
+
+    def dump(self, args) -> None:
+        profiler = self._RegisterProfiler
+        self.ensure_register_index()
+        self._RegisterValueRetriever.history.resize(self["history_depth"])
+
+        if args.trace_stop:
+            self.stop_trace()
+            return
+        if args.trace_start:
+            self.start_trace(args.trace_start, [reg for reg in args.registers if reg])
+            return
+
+        if args.format != "text":
+            expressions = []
             for reg in args.registers:
-                parsed = self._RegisterASTVisitor.parse_register(reg)
-                curr_value = self._RegisterValueRetriever.retrieve_value(parsed.reg_property)
-                prev_value = self._RegisterValueRetriever.retrieve_prev_value(parsed.reg_property)
-                field_width = self._reg_sizes_.get(parsed.reg_property.reg_name)
-                curr_string = self._RegisterPrintFormatter.string_register(parsed.reg_notation, field_width, curr_value)
-                prev_string = self._RegisterPrintFormatter.string_register(parsed.reg_notation, field_width, prev_value)
-
-                if prev_string is None:
-                    if isinstance(curr_string, list):
-                        out = "["
-                        out += ", ".join([f"{Color.colorify(sub, 'yellow')}" for sub in curr_string])
-                        out += "]"
-                    else:
-                        out = f"{Color.colorify(curr_string, 'yellow')}"
+                if reg:
+                    with profiler.stage("parse"):
+                        expressions.append((reg, self._RegisterNotationParser.parse_register(reg)))
+            group_expressions = []
+            for group in self._RegisterValueRetriever.index.groups:
+                if getattr(args, group, False):
+                    group_expressions.extend(self.group_registers(group))
+            self.dump_records(expressions, args.format, args.output, args.since, group_expressions)
+            return
+
+        renderer = self.begin_render()
+        if args.all_threads:
+            self.dump_threads([reg for reg in args.registers if reg])
+            return
 
+        if args.registers != ['']:
+            for reg in args.registers:
+                with profiler.stage("parse"):
+                    parsed = self._RegisterNotationParser.parse_register(reg)
+                if isinstance(parsed.reg_property, MemoryInfo):
+                    self.dump_memory(parsed)
+                    continue
+                if self.dump_register(parsed, args.since):
+                    renderer.newline()
+                    continue
+                reg_name = parsed.reg_property.reg_name
+                renderer.flush()
+                if self._RegisterValueRetriever.index.get(reg_name) is None:
+                    err(f"Unknown register '{reg_name}'")
                 else:
-                    last_same = lambda p, q: len(p) if len(diff := [idx for idx, (cur, prev) in enumerate(zip(p, q)) if cur != prev]) == 0 else min(diff)
-                    if isinstance(curr_string, list):
-                        out = "["
-                        out += ", ".join([Color.colorify(cur[:last_same(cur, prv)], 'yellow')+Color.colorify(cur[last_same(cur, prv):], 'yellow bold') for cur, prv in zip(curr_string, prev_string)])
-                        out += "]"
-                    else:
-                        out = f"{Color.colorify(curr_string[:last_same(curr_string, prev_string)], 'yellow')}{Color.colorify(curr_string[last_same(curr_string, prev_string):], 'yellow bold')}"
-
-                print(out)
-        #for group in self._reg_groups_:
-        #    if args.__getattribute__(group):
-        #        for reg in _reg_group_dict_[group]:
-        #            parsed = self._RegisterASTVisitor.parse_register(reg)
-        #            parsed = modify_notation_for_group(parsed, group)
-        #            print_register_with_format(parsed)
-
-
-register_external_command(ExtendedRegisterCommand())
+                    err(f"Register '{reg_name}' is unavailable")
+
+        for group in self._RegisterValueRetriever.index.groups:
+            if getattr(args, group, False):
+                self.dump_group(group, args.since)
+        with profiler.stage("print"):
+            renderer.flush()
+
+
+@register
+class RegisterBreakCommand(GenericCommand):
+    _cmdline_: str = "rezister-break"
+    _syntax_: str = f"{_cmdline_} [LOCATION PREDICATE]"
+    _example_: str = f"\n{_cmdline_} *0x401234 any($ymm0:f32 != $ymm0:f32)" f"\n{_cmdline_} loop.c:42 $xmm1[8:0]:u8 == 0xff" f"\n{_cmdline_}"
+    __doc__: str = "Breakpoint stopping only when a predicate over rezister notations holds."
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.breakpoints: list[RegisterPredicateBreakpoint] = []
+
+    def register_size(self, reg_name: str) -> None | int:
+        # The register table comes from `maint print register-groups`, which only needs the exec file, so
+        # predicates can be set before `run`.
+        _rezister_command_.ensure_register_index()
+        retriever = ExtendedRegisterCommand._RegisterValueRetriever
+        reg_info = retriever.index.get(reg_name)
+        if reg_info is not None:
+            return reg_info.size
+        if gdb.selected_thread() is None:
+            # The target's own description (AVX, AVX-512, SVE) may add it once the process runs.
+            return None
+        return len(retriever.fetch_bytes(reg_name) or b"")
+
+    def list_breakpoints(self) -> None:
+        self.breakpoints = [bp for bp in self.breakpoints if bp.is_valid()]
+        if len(self.breakpoints) == 0:
+            info("No rezister breakpoints")
+            return
+        for bp in self.breakpoints:
+            print(f"{bp.number:<4} {bp.location:<24} hits {bp.evaluations:<8} stops {bp.stop_count:<8} {bp.predicate.source}")
+
+    def do_invoke(self, argv):
+        if len(argv) == 0:
+            self.list_breakpoints()
+            return
+        if len(argv) < 2:
+            self.usage()
+            return
+        location, source = argv[0], " ".join(argv[1:])
+        try:
+            predicate = RegisterPredicate(source, ExtendedRegisterCommand._RegisterNotationParser, self.register_size)
+        except (RegisterNotationError, SyntaxError) as error:
+            err(str(error))
+            return
+        bp = RegisterPredicateBreakpoint(location, predicate, ExtendedRegisterCommand._RegisterValueRetriever)
+        self.breakpoints.append(bp)
+        info(f"rezister breakpoint {bp.number} at {location} when {source}")
+
+
+class RegisterContextPane:
+    def __init__(self, command: ExtendedRegisterCommand) -> None:
+        self.command = command
+        self._source = None
+        self._pinned: list[tuple[str, RegisterDump]] = []
+        self._errors: list[str] = []
+        self._current: dict[str, None | bytes] = {}
+        self._previous: dict[str, None | bytes] = {}
+        self._resumed = False
+        self._layout = None
+        # expression -> (raw, previous raw, rendered line)
+        self._lines: dict[str, tuple[None | bytes, None | bytes, str]] = {}
+        self.rendered = 0
+        self.reused = 0
+
+    def connect(self) -> None:
+        gdb.events.cont.connect(self.on_resume)
+
+    def on_resume(self, *_) -> None:
+        # gef draws the context from its own stop handler, which may run before ours: mark the step on resume instead.
+        self._resumed = True
+
+    def pinned(self) -> list[tuple[str, RegisterDump]]:
+        source = self.command["context_expressions"]
+        if source != self._source:
+            self._source = source
+            self._pinned, self._errors = [], []
+            for expr in source.split():
+                try:
+                    self._pinned.append((expr, self.command._RegisterNotationParser.parse_register(expr)))
+                except RegisterNotationError as error:
+                    self._errors.append(str(error))
+            self._lines.clear()
+        return self._pinned
+
+    def enabled(self) -> bool:
+        return bool(self.command["context_expressions"].strip())
+
+    def title(self) -> str:
+        return "rezister"
+
+    def display(self) -> None:
+        command = self.command
+        retriever = command._RegisterValueRetriever
+        profiler = command._RegisterProfiler
+        command.ensure_register_index()
+        pinned = self.pinned()
+        for error in self._errors:
+            err(error)
+        if len(pinned) == 0:
+            return
+
+        with profiler.stage("fetch"):
+            reg_names = [parsed.reg_property.reg_name for _, parsed in pinned if isinstance(parsed.reg_property, PropertyInfo)]
+            values = retriever.snapshot.get_many(dict.fromkeys(reg_names))
+        if self._resumed:
+            self._previous, self._resumed = self._current, False
+        self._current = values
+
+        renderer = command.begin_render()
+        if (renderer.width, renderer.lane_budget) != self._layout:
+            self._layout = (renderer.width, renderer.lane_budget)
+            self._lines.clear()
+        width = max(len(expr) for expr, _ in pinned)
+        for expr, parsed in pinned:
+            if isinstance(parsed.reg_property, MemoryInfo):
+                renderer.text(f"{expr:<{width}} :")
+                renderer.newline()
+                command.dump_memory(parsed)
+                continue
+            reg_name = parsed.reg_property.reg_name
+            raw, prev_raw = values[reg_name], self._previous.get(reg_name)
+            cached = self._lines.get(expr)
+            if cached is not None and cached[0] == raw and cached[1] == prev_raw:
+                self.reused += 1
+                line = cached[2]
+            else:
+                self.rendered += 1
+                line = self.render(parsed, raw, prev_raw, width + 3)
+                self._lines[expr] = (raw, prev_raw, line)
+            renderer.text(f"{expr:<{width}} : ")
+            renderer.write(line)
+            renderer.newline()
+        with profiler.stage("print"):
+            renderer.flush()
+
+    def render(self, parsed: RegisterDump, raw: None | bytes, prev_raw: None | bytes, column: int) -> str:
+        retriever = self.command._RegisterValueRetriever
+        formatter = self.command._RegisterPrintFormatter
+        if raw is None:
+            return Color.colorify("unavailable", "red")
+        reg_slice = parsed.reg_property.reg_slice
+        value = retriever.apply_slice(int.from_bytes(raw, "little"), reg_slice)
+        prev_value = retriever.apply_slice(int.from_bytes(prev_raw, "little"), reg_slice) if prev_raw is not None else None
+        with self.command._RegisterProfiler.stage("format"):
+            curr_string = formatter.string_register(parsed.reg_notation, len(raw), value)
+        with self.command._RegisterProfiler.stage("diff"):
+            changed = formatter.changed_lanes(parsed.reg_notation, len(raw), value, prev_value)
+        with self.command._RegisterProfiler.stage("colorize"):
+            return self.command._RegisterRenderer.format_value(curr_string, changed, column)
+
+
+_rezister_command_ = ExtendedRegisterCommand()
+register_external_command(_rezister_command_)
+register_external_command(RegisterBreakCommand())
+
+_rezister_context_pane_ = RegisterContextPane(_rezister_command_)
+_rezister_context_pane_.connect()
+register_external_context_pane("rezister", _rezister_context_pane_.display, _rezister_context_pane_.title, _rezister_context_pane_.enabled)
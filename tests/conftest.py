@@ -0,0 +1,29 @@
+"""Loads the extension outside gdb, through the stand-ins of benchmarks/fake_gef.py."""
+import pathlib
+import sys
+
+import pytest
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(ROOT / "tools"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import fake_gef  # noqa: E402
+
+
+@pytest.fixture
+def inferior():
+    return fake_gef.FakeInferior(seed=1)
+
+
+@pytest.fixture
+def extension(inferior):
+    return fake_gef.load_extension(inferior)
+
+
+@pytest.fixture
+def command(extension):
+    command = extension._rezister_command_
+    command["register_cache"] = ""
+    return command
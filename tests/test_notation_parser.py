@@ -0,0 +1,101 @@
+"""RegisterNotationParser: the notation grammar, its errors, and the parse cache."""
+import pytest
+
+from ast_formatter import MemoryInfo, NotationInfo, PropertyInfo, RegisterNotationError, RegisterNotationParser, SliceInfo
+
+MSB, LSB = SliceInfo.SliceRange.FROM_MSB, SliceInfo.SliceRange.TO_LSB
+X, U, D, F = (NotationInfo.NotationRadix.Hexadecimal, NotationInfo.NotationRadix.UnsignedDecimal,
+              NotationInfo.NotationRadix.SignedDecimal, NotationInfo.NotationRadix.Float)
+
+
+@pytest.fixture
+def parser():
+    return RegisterNotationParser()
+
+
+@pytest.mark.parametrize("annotation, reg_name, slice_from, slice_to, radix, unit", [
+    ("$rax", "rax", MSB, LSB, X, NotationInfo.NotationUnit.DEFAULT),
+    ("rax", "rax", MSB, LSB, X, NotationInfo.NotationUnit.DEFAULT),
+    ("$ymm0:f32", "ymm0", MSB, LSB, F, 32),
+    ("$zmm0:d128", "zmm0", MSB, LSB, D, 128),
+    ("$rax[16:8]:x8", "rax", 16, 8, X, 8),
+    ("$rax[0x10:0b1000]", "rax", 16, 8, X, NotationInfo.NotationUnit.DEFAULT),
+    ("$rax[:8]", "rax", MSB, 8, X, NotationInfo.NotationUnit.DEFAULT),
+    ("$rax[16:]", "rax", 16, LSB, X, NotationInfo.NotationUnit.DEFAULT),
+    (" $rax : u8 ", "rax", MSB, LSB, U, 8),
+])
+def test_registers(parser, annotation, reg_name, slice_from, slice_to, radix, unit):
+    dump = parser.parse_register(annotation)
+    assert isinstance(dump.reg_property, PropertyInfo)
+    assert dump.reg_property.reg_name == reg_name
+    assert (dump.reg_property.reg_slice.slice_from, dump.reg_property.reg_slice.slice_to) == (slice_from, slice_to)
+    assert (dump.reg_notation.radix, dump.reg_notation.unit) == (radix, unit)
+
+
+@pytest.mark.parametrize("annotation, base, slice_from, slice_to, unit", [
+    ("*0x1000[16]:x8", 0x1000, 16, 0, 8),
+    ("*4096[32:16]", 4096, 32, 16, NotationInfo.NotationUnit.DEFAULT),
+    ("*$rsp[32:16]", "rsp", 32, 16, NotationInfo.NotationUnit.DEFAULT),
+    ("*rsp[8:]:x64", "rsp", 8, 0, 64),
+    ("*($rdi)[0x10:0]:u8", "rdi", 16, 0, 8),
+    ("*(rdi)", "rdi", MSB, LSB, NotationInfo.NotationUnit.DEFAULT),
+])
+def test_memory(parser, annotation, base, slice_from, slice_to, unit):
+    dump = parser.parse_register(annotation)
+    assert isinstance(dump.reg_property, MemoryInfo)
+    assert dump.reg_property.base == base
+    assert (dump.reg_property.mem_slice.slice_from, dump.reg_property.mem_slice.slice_to) == (slice_from, slice_to)
+    assert dump.reg_notation.unit == unit
+
+
+@pytest.mark.parametrize("annotation, message, column", [
+    ("", "Expected name, found end of notation", 0),
+    ("$ymm0[31]", "Register must be sliced with ':'", 8),
+    ("$rax:", "Expected name, found end of notation", 5),
+    ("$rax:x", "Invalid notation 'x', expected radix and bit width (e.g. x64)", 5),
+    ("$rax:64", "Expected name, found '64'", 5),
+    ("$rax#", "Unexpected character '#'", 4),
+    ("$rax[8:0", "Expected ], found end of notation", 8),
+    ("$rax $rbx", "Expected end of notation, found '$'", 5),
+    ("*(rsp", "Expected ), found end of notation", 5),
+    ("*$rsp[:8]", "Memory must be sliced with an end offset, e.g. [4096:0]", 6),
+    ("*$rsp[8:16]", "Memory slice end must be above its start, e.g. [4096:0]", 6),
+])
+def test_errors(parser, annotation, message, column):
+    with pytest.raises(RegisterNotationError) as info:
+        parser.parse_register(annotation)
+    error = info.value
+    assert (error.message, error.column, error.annotation) == (message, column, annotation)
+    # The caret of the message sits under the offending column.
+    _, shown, caret = str(error).split("\n")
+    assert caret.index("^") - 4 == column and shown == f"    {annotation}"
+
+
+def test_errors_are_type_errors(parser):
+    with pytest.raises(TypeError):
+        parser.parse_register("$rax:")
+
+
+def test_cache(parser):
+    first = parser.parse_register("$xmm0[64:0]:f32")
+    assert parser.parse_register("$xmm0[64:0]:f32") is first
+    assert parser.cache_info().hits == 1
+    other = parser.parse_register("$xmm0[64:0]:f64")
+    assert other is not first and other.reg_notation.unit == 64
+
+
+def test_cache_is_bounded():
+    parser = RegisterNotationParser(cache_size=2)
+    first = parser.parse_register("$rax")
+    parser.parse_register("$rbx")
+    parser.parse_register("$rcx")
+    again = parser.parse_register("$rax")
+    assert again is not first
+    assert again.reg_property.reg_name == first.reg_property.reg_name
+    assert parser.cache_info().currsize == 2
+
+
+def test_results_are_read_only(parser):
+    dump = parser.parse_register("$rax:x8")
+    with pytest.raises(AttributeError):
+        dump.reg_notation = None
@@ -0,0 +1,30 @@
+"""Register bytes as fetched with and without gdb.Value.bytes (gdb 13+ / older)."""
+import pytest
+
+# 1.5 as x87 extended: sign 0, exponent 0x3fff, mantissa 0xc000000000000000.
+ST0 = (0x3fff << 64 | 0xc000000000000000).to_bytes(10, "little")
+
+
+@pytest.fixture(params=[True, False], ids=["value-bytes", "gdb-12"])
+def retriever(request, command, extension, inferior, monkeypatch):
+    monkeypatch.setattr(extension.RegisterValueRetriever, "_VALUE_HAS_BYTES", request.param)
+    inferior.registers["st0"] = ST0
+    command.ensure_register_index()
+    return command._RegisterValueRetriever
+
+
+@pytest.mark.parametrize("reg_name", ["rax", "eflags", "mxcsr", "st0", "st1", "xmm3", "ymm7", "zmm31", "k2"])
+def test_raw_bytes(retriever, inferior, reg_name):
+    assert retriever.fetch_bytes(reg_name) == inferior.registers[reg_name]
+
+
+def test_float_register_is_not_converted(retriever, inferior, command, capsys):
+    # int() of st0 would be 1: its bits must come from `info registers` instead.
+    command.do_invoke(["$st0:f80", "$st0:x8"])
+    out = capsys.readouterr().out
+    assert "1.5" in out
+    assert "0xff" in out and "0x3f" in out
+
+
+def test_unknown_register(retriever):
+    assert retriever.fetch_bytes("nosuch") is None
@@ -0,0 +1,78 @@
+"""Register history ring: slots per stop, --since, and rezister called from a stop hook."""
+import json
+
+import fake_gef
+
+
+def jsonl(command, capsys, *argv) -> list[dict]:
+    capsys.readouterr()
+    command.do_invoke(["--format", "jsonl", *argv])
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def step(inferior, rax: int, hook=None) -> None:
+    # gdb order: cont, the inferior runs, hook-stop commands, then the stop observers.
+    fake_gef.resume(inferior, mutate=0)
+    inferior.registers["rax"] = rax.to_bytes(8, "little")
+    if hook is not None:
+        hook()
+    fake_gef.builtins.gdb.events.stop.fire()
+
+
+def test_changed_lanes_against_previous_stop(command, inferior, capsys):
+    step(inferior, 0x01)
+    jsonl(command, capsys, "$rax:x8")
+    step(inferior, 0x02)
+    record, = jsonl(command, capsys, "$rax:x8")
+    assert record["changed"] == [True] + [False] * 7
+    step(inferior, 0x02)
+    record, = jsonl(command, capsys, "$rax:x8")
+    assert record["changed"] == [False] * 8
+
+
+def test_invoked_from_stop_hook(command, inferior, capsys):
+    records = []
+    for value in (0x01, 0x02, 0x02, 0x03):
+        step(inferior, value, hook=lambda: records.extend(jsonl(command, capsys, "$rax:x8")))
+    history = command._RegisterValueRetriever.history
+    assert history.stop_count == 4
+    assert [history.get("rax", since)[0] for since in range(4)] == [0x03, 0x02, 0x02, 0x01]
+    assert [record["changed"][0] for record in records[1:]] == [True, False, True]
+    assert not any(any(record["changed"][1:]) for record in records[1:])
+
+
+def test_repeated_resumes_open_one_slot(command, inferior, capsys):
+    jsonl(command, capsys, "$rax")
+    history = command._RegisterValueRetriever.history
+    for _ in range(3):
+        fake_gef.builtins.gdb.events.cont.fire()
+    fake_gef.builtins.gdb.events.stop.fire()
+    assert history.stop_count == 1
+
+
+def test_since(command, inferior, capsys):
+    jsonl(command, capsys, "$rax")
+    for value in range(5):
+        step(inferior, value)
+    history = command._RegisterValueRetriever.history
+    assert [history.get("rax", since)[0] for since in range(5)] == [4, 3, 2, 1, 0]
+    assert history.get("rax", history.depth) is None
+
+
+def test_depth_below_two_keeps_the_ring(command, inferior, capsys):
+    command["history_depth"] = 1
+    jsonl(command, capsys, "$rax")
+    fake_gef.stop(inferior, mutate=0)
+    jsonl(command, capsys, "$rax")
+    history = command._RegisterValueRetriever.history
+    assert history.depth == 2
+    assert history.get("rax", 1) is not None
+
+
+def test_group_dumps_are_not_tracked(command, inferior, capsys):
+    jsonl(command, capsys, "--sse")
+    history = command._RegisterValueRetriever.history
+    assert "xmm0" not in history._tracked
+    inferior.frame.read_count = 0
+    fake_gef.stop(inferior, mutate=0)
+    assert inferior.frame.read_count == 0
@@ -0,0 +1,96 @@
+"""rezister-break predicates: lane-wise comparisons over rezister notations."""
+import math
+import struct
+
+import pytest
+
+import fake_gef
+
+
+@pytest.fixture
+def predicate(extension, command):
+    command.ensure_register_index()
+    index = command._RegisterValueRetriever.index
+
+    def build(source: str, sizes=None):
+        sizes = sizes or (lambda reg_name: index[reg_name].size if reg_name in index else 0)
+        return extension.RegisterPredicate(source, command._RegisterNotationParser, sizes)
+    return build
+
+
+def fetcher(inferior, calls=None):
+    def fetch(reg_name):
+        if calls is not None:
+            calls.append(reg_name)
+        return inferior.registers.get(reg_name)
+    return fetch
+
+
+def test_lane_comparisons(predicate, inferior):
+    inferior.registers["xmm0"] = bytes(range(16))
+    fetch = fetcher(inferior)
+    assert predicate("$xmm0:u8 < 16").evaluate(fetch)
+    assert not predicate("$xmm0:u8 == 3").evaluate(fetch)
+    assert predicate("any($xmm0:u8 == 3)").evaluate(fetch)
+    assert predicate("sum($xmm0:u8) == 120 and max($xmm0:u8) == 15").evaluate(fetch)
+    assert predicate("$xmm0[16:0]:x16 == 0x0100").evaluate(fetch)
+
+
+def test_integer_lanes_do_not_wrap(predicate, inferior):
+    inferior.registers["xmm0"] = bytes([0xff]) * 16
+    fetch = fetcher(inferior)
+    assert predicate("$xmm0:u8 + 1 == 256").evaluate(fetch)
+    assert predicate("$xmm0:d8 == -1").evaluate(fetch)
+    assert predicate("-$xmm0:u8 == -255").evaluate(fetch)
+
+
+def test_float_lanes(predicate, inferior):
+    inferior.registers["xmm1"] = struct.pack("<4f", 1.5, math.nan, -2.0, math.inf)
+    inferior.registers["st0"] = (0x3fff << 64 | 0xc000000000000000).to_bytes(10, "little")
+    fetch = fetcher(inferior)
+    assert predicate("any($xmm1:f32 != $xmm1:f32)").evaluate(fetch)
+    assert not predicate("all(abs($xmm1:f32) < inf)").evaluate(fetch)
+    assert predicate("$st0:f80 == 1.5").evaluate(fetch)
+
+
+def test_each_register_is_read_once(predicate, inferior):
+    calls = []
+    predicate("$xmm0:u8 != $xmm0:u8 or $xmm0[32:0]:x32 == 0 or $rax == $rax").evaluate(fetcher(inferior, calls))
+    assert sorted(calls) == ["rax", "xmm0"]
+
+
+def test_errors(predicate, extension, inferior):
+    with pytest.raises(extension.RegisterNotationError, match="no register operand"):
+        predicate("1 == 1")
+    with pytest.raises(extension.RegisterNotationError, match="Unknown register 'nosuch'"):
+        predicate("$rax == 0 or $nosuch == 1")
+    with pytest.raises(ValueError, match="unavailable"):
+        predicate("$rax == 0").evaluate(lambda reg_name: None)
+
+
+def test_sized_at_first_read(predicate, inferior):
+    inferior.registers["ymm0"] = bytes([1]) * 32
+    deferred = predicate("$ymm0:u8 == 1 and len($ymm0:u8) == 32", sizes=lambda reg_name: None)
+    assert deferred.evaluate(fetcher(inferior))
+
+
+def test_break_before_run(extension, inferior, monkeypatch, capsys):
+    gdb = fake_gef.builtins.gdb
+    monkeypatch.setattr(gdb, "selected_thread", lambda: None)
+    monkeypatch.setattr(gdb, "selected_frame", lambda: (_ for _ in ()).throw(gdb.error("No frame is currently selected.")))
+    command = extension.RegisterBreakCommand()
+    command.do_invoke(["*0x401000", "$rax:u8", "==", "7"])
+    command.do_invoke(["*0x401000", "$nosuch", "==", "7"])
+    out = capsys.readouterr().out
+    assert "when $rax:u8 == 7" in out and "when $nosuch == 7" in out
+
+    monkeypatch.undo()
+    bp, unknown = command.breakpoints
+    inferior.registers["rax"] = bytes([7]) * 8
+    assert bp.stop()
+    inferior.registers["rax"] = bytes([7]) * 7 + bytes([8])
+    assert not bp.stop()
+    assert (bp.evaluations, bp.stop_count) == (2, 1)
+    # Registers the table did not know before `run` are checked at the first hit, which stops with an error.
+    assert unknown.stop()
+    assert "Register 'nosuch' is unavailable" in capsys.readouterr().out
@@ -0,0 +1,98 @@
+"""RegisterRenderer: lane wrapping, collapsing of equal runs, one write per command, and unreadable registers."""
+import re
+
+import pytest
+
+import fake_gef
+
+ESCAPES = re.compile(r"\x1b\[[0-9;]*m")
+BOLD = fake_gef.Color.COLORS["bold"]
+
+
+def plain(text: str) -> str:
+    return ESCAPES.sub("", text)
+
+
+@pytest.fixture
+def renderer(extension):
+    renderer = extension.RegisterRenderer()
+    renderer.begin(width=40, lane_budget=0)
+    return renderer
+
+
+def test_scalar(renderer):
+    assert plain(renderer.format_value("0x01", None)) == "0x01"
+    assert BOLD not in renderer.format_value("0x01", [False])
+    assert BOLD in renderer.format_value("0x01", [False, True])
+
+
+def test_changed_lanes_are_bold(renderer):
+    out = renderer.format_value(["0x00", "0x01", "0x02"], [False, True, False])
+    assert plain(out) == "[0x00, 0x01, 0x02]"
+    assert [BOLD in part for part in out.split(", ")] == [False, True, False]
+
+
+def test_wrap_at_terminal_width_under_the_bracket(renderer):
+    lanes = [f"{idx:#06x}" for idx in range(16)]
+    renderer.text("xmm0 : ")
+    renderer.value(lanes, None)
+    lines = plain(renderer._buffer.getvalue()).split("\n")
+    assert len(lines) > 1
+    assert all(len(line) <= renderer.width for line in lines)
+    assert all(line.startswith(" " * 8) and line[8] != " " for line in lines[1:])
+    assert re.findall(r"0x[0-9a-f]+", "".join(lines)) == lanes
+
+
+def test_no_wrap(renderer):
+    lanes = [f"{idx:#06x}" for idx in range(16)]
+    assert "\n" not in renderer.format_value(lanes, None, wrap=False)
+
+
+def test_collapse_runs_over_the_lane_budget(renderer):
+    renderer.lane_budget = 4
+    lanes = ["0x00"] * 4 + ["0x01"] + ["0x00"] * 2
+    assert plain(renderer.format_value(lanes, None)) == "[0x00 ×4, 0x01, 0x00, 0x00]"
+    # A changed lane breaks a run, so highlighting is never hidden in a count.
+    changed = [False, False, True, False, False, False, False]
+    assert plain(renderer.format_value(lanes, changed, wrap=False)) == "[0x00, 0x00, 0x00, 0x00, 0x01, 0x00, 0x00]"
+
+
+def test_no_collapse_within_budget_or_when_disabled(renderer):
+    lanes = ["0x00"] * 6
+    renderer.lane_budget = 6
+    assert plain(renderer.format_value(lanes, None)).count("0x00") == 6
+    renderer.lane_budget = 0
+    assert plain(renderer.format_value(lanes, None)).count("0x00") == 6
+    renderer.lane_budget = 2
+    assert plain(renderer.format_value(lanes, None, collapse=False)).count("0x00") == 6
+    assert plain(renderer.format_value(lanes, None)) == "[0x00 ×6]"
+
+
+def test_one_write_per_flush(renderer, monkeypatch):
+    writes = []
+    monkeypatch.setattr(fake_gef.builtins.gdb, "write", writes.append)
+    for name in ("rax", "rbx", "rcx"):
+        renderer.text(f"{name} : ")
+        renderer.value("0x00", None)
+        renderer.newline()
+    assert writes == []
+    renderer.flush()
+    renderer.flush()
+    assert len(writes) == 1 and plain(writes[0]) == "rax : 0x00\nrbx : 0x00\nrcx : 0x00\n"
+
+
+def test_command_output_is_written_once(command, monkeypatch):
+    writes = []
+    monkeypatch.setattr(fake_gef.builtins.gdb, "write", writes.append)
+    command.do_invoke(["$rax", "$xmm0:u8", "--sse"])
+    assert len(writes) == 1
+
+
+def test_unknown_register_is_reported_in_order(command, monkeypatch):
+    events = []
+    monkeypatch.setattr(fake_gef.builtins.gdb, "write", lambda text: events.append(("write", plain(text))))
+    monkeypatch.setattr(fake_gef.builtins, "err", lambda text: events.append(("err", text)))
+    command.do_invoke(["$rax", "$nosuch", "$rbx"])
+    assert [kind for kind, _ in events] == ["write", "err", "write"]
+    assert events[1][1] == "Unknown register 'nosuch'"
+    assert "None" not in events[0][1] + events[2][1]
@@ -0,0 +1,52 @@
+"""Traces written by `rezister --trace-start`, read back by RegisterTraceReader and rezister_offline."""
+import fake_gef
+import rezister_offline
+from ast_formatter import RegisterTraceReader
+
+
+def record_trace(command, inferior, path, stops: int) -> list[dict[str, bytes]]:
+    command.do_invoke(["--trace-start", str(path), "$rax", "$xmm0[32:0]:x8", "$rax:u8"])
+    expected = [{name: inferior.registers[name] for name in ("rip", "rax", "xmm0")}]
+    for _ in range(stops):
+        fake_gef.resume(inferior, mutate=0)
+        for name in ("rip", "rax", "xmm0"):
+            inferior.registers[name] = inferior.random.randbytes(len(inferior.registers[name]))
+        fake_gef.builtins.gdb.events.stop.fire()
+        expected.append({name: inferior.registers[name] for name in ("rip", "rax", "xmm0")})
+    command.do_invoke(["--trace-stop"])
+    return expected
+
+
+def test_round_trip(command, extension, inferior, tmp_path, monkeypatch, capsys):
+    # Small chunks, so the writer has to grow its map while recording.
+    monkeypatch.setattr(extension.RegisterTraceWriter, "CHUNK_RECORDS", 2)
+    path = tmp_path / "regs.trace"
+    expected = record_trace(command, inferior, path, stops=4)
+    assert "Recorded 5 stops" in capsys.readouterr().out
+
+    with RegisterTraceReader(str(path)) as reader:
+        assert len(reader) == 5
+        assert list(reader.layout) == ["rax", "xmm0"]
+        for (step, pc, record), regs in zip(reader.records(), expected):
+            assert pc == int.from_bytes(regs["rip"], "little")
+            assert record["rax"] == regs["rax"]
+            assert record["xmm0"] == regs["xmm0"]
+            assert "rbx" not in record
+
+    lines = rezister_offline.query(str(path), ["$rax", "$xmm0[32:0]:x8"], None, None, start=3)
+    assert len(lines) == 4
+    for line, (step, regs) in zip(lines[::2], enumerate(expected[3:], 3)):
+        assert line.split()[:2] == [str(step), f"{int.from_bytes(regs['rip'], 'little'):#018x}"]
+        assert line.endswith(f"$rax = {int.from_bytes(regs['rax'], 'little'):#018x}")
+    # A slice keeps the register's width, its upper lanes zero.
+    xmm0_lanes = expected[3]["xmm0"][:4] + bytes(12)
+    assert lines[1].endswith("$xmm0[32:0]:x8 = [" + ", ".join(f"{byte:#04x}" for byte in xmm0_lanes) + "]")
+
+
+def test_history_is_paused_while_tracing(command, inferior, tmp_path):
+    command.do_invoke(["--sse"])
+    command.do_invoke(["--trace-start", str(tmp_path / "regs.trace"), "$xmm0"])
+    inferior.frame.read_count = 0
+    fake_gef.stop(inferior, mutate=0)
+    assert inferior.frame.read_count == 1  # xmm0 only; the pc comes from frame.pc()
+    command.do_invoke(["--trace-stop"])
@@ -0,0 +1,112 @@
+"""Core-note and XSAVE parsing of rezister_offline, against small synthetic ELF core files."""
+import pathlib
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "tools"))
+
+import rezister_offline  # noqa: E402
+from rezister_offline import X86_64CoreRegisters  # noqa: E402
+
+XSTATE_SIZE = X86_64CoreRegisters.HI16_ZMM_OFFSET + 16 * 64
+ALL_COMPONENTS = (
+    X86_64CoreRegisters.YMM_HI_BIT | X86_64CoreRegisters.OPMASK_BIT
+    | X86_64CoreRegisters.ZMM_HI256_BIT | X86_64CoreRegisters.HI16_ZMM_BIT
+)
+
+
+def note(note_type: int, desc: bytes) -> bytes:
+    name = b"CORE\0"
+    pad = lambda blob: blob + bytes(-len(blob) % 4)
+    return struct.pack("<III", len(name), len(desc), note_type) + pad(name) + pad(desc)
+
+
+def prstatus(rip: int, rax: int) -> bytes:
+    desc = bytearray(X86_64CoreRegisters.PRSTATUS_REGS_OFFSET + len(X86_64CoreRegisters.PRSTATUS_REGS) * 8)
+    for idx, (name, _) in enumerate(X86_64CoreRegisters.PRSTATUS_REGS):
+        value = {"rip": rip, "rax": rax}.get(name, 0)
+        struct.pack_into("<Q", desc, X86_64CoreRegisters.PRSTATUS_REGS_OFFSET + idx * 8, value)
+    return bytes(desc)
+
+
+def xstate(xstate_bv: int) -> bytes:
+    desc = bytearray(XSTATE_SIZE)
+    struct.pack_into("<I", desc, 24, 0x1f80)
+    for idx in range(16):
+        desc[160 + idx * 16:176 + idx * 16] = bytes([0x10 + idx]) * 16
+        desc[576 + idx * 16:592 + idx * 16] = bytes([0x20 + idx]) * 16
+        desc[1152 + idx * 32:1184 + idx * 32] = bytes([0x30 + idx]) * 32
+        desc[1664 + idx * 64:1728 + idx * 64] = bytes([0x40 + idx]) * 64
+    for idx in range(8):
+        struct.pack_into("<Q", desc, 1088 + idx * 8, 0x100 + idx)
+    struct.pack_into("<Q", desc, X86_64CoreRegisters.XSTATE_BV_OFFSET, xstate_bv)
+    return bytes(desc)
+
+
+def core_file(path: pathlib.Path, notes: bytes, e_type: int = 4, e_machine: int = 62) -> str:
+    phoff, phentsize = 64, 56
+    header = b"\x7fELF" + bytes([2, 1, 1]) + bytes(9)
+    header += struct.pack("<HHIQQQIHHHHHH", e_type, e_machine, 1, 0, phoff, 0, 0, 64, phentsize, 1, 0, 0, 0)
+    phdr = struct.pack("<IIQQQQQQ", X86_64CoreRegisters.PT_NOTE, 0, phoff + phentsize, 0, 0, len(notes), 0, 4)
+    path.write_bytes(header + phdr + notes)
+    return str(path)
+
+
+def test_threads_and_xsave_components(tmp_path):
+    notes = (
+        note(X86_64CoreRegisters.NT_PRSTATUS, prstatus(0x401000, 0x1122334455667788))
+        + note(X86_64CoreRegisters.NT_X86_XSTATE, xstate(ALL_COMPONENTS))
+        + note(X86_64CoreRegisters.NT_PRSTATUS, prstatus(0x402000, 7))
+    )
+    core = X86_64CoreRegisters(core_file(tmp_path / "core", notes))
+
+    assert len(core) == 2
+    first, second = core.threads
+    assert int.from_bytes(first["rip"], "little") == 0x401000
+    assert int.from_bytes(first["rax"], "little") == 0x1122334455667788
+    assert first["mxcsr"] == struct.pack("<I", 0x1f80)
+    assert first["xmm3"] == bytes([0x13]) * 16
+    assert first["ymm3"] == bytes([0x13]) * 16 + bytes([0x23]) * 16
+    assert first["zmm3"] == first["ymm3"] + bytes([0x33]) * 32
+    assert first["zmm17"] == bytes([0x41]) * 64
+    assert first["xmm17"] == bytes([0x41]) * 16
+    assert int.from_bytes(first["k5"], "little") == 0x105
+    assert "xmm0" not in second
+    assert [(step, pc) for step, pc, _ in core.records()] == [(0, 0x401000), (1, 0x402000)]
+
+
+def test_components_missing_from_xstate_bv_are_zero(tmp_path):
+    notes = (
+        note(X86_64CoreRegisters.NT_PRSTATUS, prstatus(0x401000, 0))
+        + note(X86_64CoreRegisters.NT_X86_XSTATE, xstate(X86_64CoreRegisters.OPMASK_BIT))
+    )
+    regs, = X86_64CoreRegisters(core_file(tmp_path / "core", notes)).threads
+
+    assert regs["ymm1"] == bytes([0x11]) * 16 + bytes(16)
+    assert regs["zmm1"] == regs["ymm1"] + bytes(32)
+    assert regs["zmm16"] == bytes(64)
+    assert int.from_bytes(regs["k0"], "little") == 0x100
+
+
+def test_query_formats_core_registers(tmp_path):
+    notes = (
+        note(X86_64CoreRegisters.NT_PRSTATUS, prstatus(0x401000, 0x1122334455667788))
+        + note(X86_64CoreRegisters.NT_X86_XSTATE, xstate(ALL_COMPONENTS))
+    )
+    path = core_file(tmp_path / "core", notes)
+
+    lines = rezister_offline.query(path, ["$rax[15:0]", "$xmm2:x32"], None, None)
+    assert lines[0].endswith("$rax[15:0] = 0x0000000000007788")
+    assert lines[1].endswith("$xmm2:x32 = [0x12121212, 0x12121212, 0x12121212, 0x12121212]")
+
+
+@pytest.mark.parametrize(
+    "e_type, e_machine, message",
+    [(2, 62, "not a core dump"), (4, 183, "not an x86-64 core dump")],
+)
+def test_rejects_other_elf_files(tmp_path, e_type, e_machine, message):
+    path = core_file(tmp_path / "elf", b"", e_type=e_type, e_machine=e_machine)
+    with pytest.raises(ValueError, match=message):
+        rezister_offline.open_source(path)
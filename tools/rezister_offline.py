@@ -0,0 +1,249 @@
+"""Query recorded registers without gdb.
+
+    python tools/rezister_offline.py trace.bin '$ymm0[15:0]:f32' '$rax'
+    python tools/rezister_offline.py --pc-range 0x401000:0x401200 --where 'any(v != v for v in lanes)' trace.bin '$ymm0:f32'
+    python tools/rezister_offline.py core '$xmm0:u8'
+
+Sources are traces written by `rezister --trace-start`, or x86-64 ELF core dumps (one record per thread).
+"""
+import argparse
+import concurrent.futures
+import functools
+import os
+import pathlib
+import struct
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parent.parent / "src"))
+
+from ast_formatter import (  # noqa: E402
+    MemoryInfo,
+    RegisterDump,
+    RegisterNotationParser,
+    RegisterPrintFormatter,
+    RegisterTraceReader,
+    apply_slice,
+)
+
+
+class X86_64CoreRegisters:
+    NT_PRSTATUS = 1
+    NT_FPREGSET = 2
+    NT_X86_XSTATE = 0x202
+    PT_NOTE = 4
+    ET_CORE = 4
+    EM_X86_64 = 62
+
+    PRSTATUS_REGS_OFFSET = 112
+    # struct user_regs_struct, with gdb's register sizes
+    PRSTATUS_REGS = [
+        ("r15", 8), ("r14", 8), ("r13", 8), ("r12", 8), ("rbp", 8), ("rbx", 8), ("r11", 8), ("r10", 8),
+        ("r9", 8), ("r8", 8), ("rax", 8), ("rcx", 8), ("rdx", 8), ("rsi", 8), ("rdi", 8), ("orig_rax", 8),
+        ("rip", 8), ("cs", 4), ("eflags", 4), ("rsp", 8), ("ss", 4), ("fs_base", 8), ("gs_base", 8),
+        ("ds", 4), ("es", 4), ("fs", 4), ("gs", 4),
+    ]
+    # XSAVE standard format offsets of the AVX / AVX-512 components, and their XSTATE_BV bits
+    XSTATE_BV_OFFSET = 512
+    YMM_HI_OFFSET, YMM_HI_BIT = 576, 1 << 2
+    OPMASK_OFFSET, OPMASK_BIT = 1088, 1 << 5
+    ZMM_HI256_OFFSET, ZMM_HI256_BIT = 1152, 1 << 6
+    HI16_ZMM_OFFSET, HI16_ZMM_BIT = 1664, 1 << 7
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as core_file:
+            self._data = core_file.read()
+        if len(self._data) < 64 or self._data[:4] != b"\x7fELF" or self._data[4] != 2:
+            raise ValueError(f"'{path}' is not a 64-bit ELF core file")
+        e_type, e_machine = struct.unpack_from("<HH", self._data, 16)
+        if e_type != self.ET_CORE:
+            raise ValueError(f"'{path}' is an ELF file but not a core dump (e_type {e_type})")
+        if e_machine != self.EM_X86_64:
+            raise ValueError(f"'{path}' is not an x86-64 core dump (e_machine {e_machine})")
+        self.threads = self._parse_threads()
+
+    def __len__(self) -> int:
+        return len(self.threads)
+
+    def _notes(self):
+        data = self._data
+        phoff, = struct.unpack_from("<Q", data, 32)
+        phentsize, phnum = struct.unpack_from("<HH", data, 54)
+        for idx in range(phnum):
+            p_type, _, p_offset, _, _, p_filesz = struct.unpack_from("<IIQQQQ", data, phoff + idx * phentsize)
+            if p_type != self.PT_NOTE:
+                continue
+            pos, end = p_offset, p_offset + p_filesz
+            while pos + 12 <= end:
+                namesz, descsz, note_type = struct.unpack_from("<III", data, pos)
+                desc = pos + 12 + ((namesz + 3) & ~3)
+                yield note_type, memoryview(data)[desc:desc + descsz]
+                pos = desc + ((descsz + 3) & ~3)
+
+    def _parse_threads(self) -> list[dict[str, bytes]]:
+        threads = []
+        for note_type, desc in self._notes():
+            if note_type == self.NT_PRSTATUS:
+                regs = {}
+                for idx, (name, size) in enumerate(self.PRSTATUS_REGS):
+                    offset = self.PRSTATUS_REGS_OFFSET + idx * 8
+                    regs[name] = bytes(desc[offset:offset + size])
+                threads.append(regs)
+            elif note_type == self.NT_FPREGSET and threads:
+                self._add_fxsave(threads[-1], desc)
+            elif note_type == self.NT_X86_XSTATE and threads:
+                self._add_fxsave(threads[-1], desc)
+                self._add_xstate(threads[-1], desc)
+        return threads
+
+    @staticmethod
+    def _add_fxsave(regs: dict[str, bytes], fxsave: memoryview) -> None:
+        if len(fxsave) < 416:
+            return
+        regs["fctrl"] = bytes(fxsave[0:2]) + bytes(2)
+        regs["fstat"] = bytes(fxsave[2:4]) + bytes(2)
+        regs["fop"] = bytes(fxsave[6:8]) + bytes(2)
+        regs["mxcsr"] = bytes(fxsave[24:28])
+        for idx in range(8):
+            regs[f"st{idx}"] = bytes(fxsave[32 + idx * 16:42 + idx * 16])
+        for idx in range(16):
+            regs[f"xmm{idx}"] = bytes(fxsave[160 + idx * 16:176 + idx * 16])
+
+    def _add_xstate(self, regs: dict[str, bytes], xstate: memoryview) -> None:
+        if len(xstate) < self.XSTATE_BV_OFFSET + 8:
+            return
+        xstate_bv, = struct.unpack_from("<Q", xstate, self.XSTATE_BV_OFFSET)
+
+        def component(offset: int, size: int, bit: int) -> None | bytes:
+            # Components not flagged in XSTATE_BV are in their initial (all zero) state.
+            if len(xstate) < offset + size:
+                return None
+            return bytes(xstate[offset:offset + size]) if xstate_bv & bit else bytes(size)
+
+        for idx in range(16):
+            ymm_hi = component(self.YMM_HI_OFFSET + idx * 16, 16, self.YMM_HI_BIT)
+            if ymm_hi is None:
+                return
+            regs[f"ymm{idx}"] = regs[f"xmm{idx}"] + ymm_hi
+        for idx in range(8):
+            opmask = component(self.OPMASK_OFFSET + idx * 8, 8, self.OPMASK_BIT)
+            if opmask is not None:
+                regs[f"k{idx}"] = opmask
+        for idx in range(16):
+            zmm_hi = component(self.ZMM_HI256_OFFSET + idx * 32, 32, self.ZMM_HI256_BIT)
+            if zmm_hi is not None:
+                regs[f"zmm{idx}"] = regs[f"ymm{idx}"] + zmm_hi
+        for idx in range(16, 32):
+            zmm = component(self.HI16_ZMM_OFFSET + (idx - 16) * 64, 64, self.HI16_ZMM_BIT)
+            if zmm is not None:
+                regs[f"xmm{idx}"], regs[f"ymm{idx}"], regs[f"zmm{idx}"] = zmm[:16], zmm[:32], zmm
+
+    def records(self, start: int = 0, stop: None | int = None):
+        for step, regs in enumerate(self.threads[start:stop], start):
+            yield step, int.from_bytes(regs["rip"], "little"), regs
+
+
+def open_source(path: str):
+    with open(path, "rb") as source:
+        magic = source.read(8)
+    if magic == RegisterTraceReader.MAGIC:
+        return RegisterTraceReader(path)
+    if magic[:4] == b"\x7fELF":
+        return X86_64CoreRegisters(path)
+    raise ValueError(f"'{path}' is neither a rezister trace nor an ELF core file")
+
+
+def filter_pc(records, pc_range: None | tuple[int, int]):
+    if pc_range is None:
+        yield from records
+        return
+    low, high = pc_range
+    for step, pc, regs in records:
+        if low <= pc < high:
+            yield step, pc, regs
+
+
+def evaluate(records, expressions: list[str], where: None | str):
+    parser = RegisterNotationParser()
+    formatter = RegisterPrintFormatter([])
+    dumps: list[tuple[str, RegisterDump]] = [(expr, parser.parse_register(expr)) for expr in expressions]
+    predicate = compile(where, "<where>", "eval") if where else None
+
+    for step, pc, regs in records:
+        for expr, dump in dumps:
+            raw = regs.get(dump.reg_property.reg_name)
+            if raw is None:
+                continue
+            value = apply_slice(int.from_bytes(raw, "little"), dump.reg_property.reg_slice)
+            if predicate is not None:
+                _, lanes = formatter.lane_values(dump.reg_notation.radix, dump.reg_notation.unit, len(raw), value)
+                if not eval(predicate, {"lanes": lanes, "pc": pc, "step": step}):
+                    continue
+            yield step, pc, expr, formatter.string_register(dump.reg_notation, len(raw), value)
+
+
+def render(results):
+    for step, pc, expr, formatted in results:
+        if isinstance(formatted, list):
+            formatted = f"[{', '.join(str(lane) for lane in formatted)}]"
+        yield f"{step:>8} {pc:#018x} {expr} = {formatted}"
+
+
+def query(path: str, expressions: list[str], pc_range: None | tuple[int, int], where: None | str, start: int = 0, stop: None | int = None) -> list[str]:
+    source = open_source(path)
+    try:
+        return list(render(evaluate(filter_pc(source.records(start, stop), pc_range), expressions, where)))
+    finally:
+        if isinstance(source, RegisterTraceReader):
+            source.close()
+
+
+def parse_range(text: str) -> tuple[int, int]:
+    low, _, high = text.partition(":")
+    return int(low, 0) if low else 0, int(high, 0) if high else 1 << 64
+
+
+def main(argv: None | list[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="rezister_offline", description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="trace file from `rezister --trace-start`, or an x86-64 ELF core dump")
+    parser.add_argument("registers", nargs="+", help="register notations, e.g. '$ymm0[15:0]:f32'")
+    parser.add_argument("--pc-range", type=parse_range, help="only records with LOW <= pc < HIGH, as LOW:HIGH")
+    parser.add_argument("--steps", type=parse_range, help="only records START:STOP")
+    parser.add_argument("--where", help="python expression over `lanes` (decoded lane values), `pc` and `step`")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes for large traces")
+    parser.add_argument("--chunk", type=int, default=65536, help="records per worker task")
+    args = parser.parse_args(argv)
+
+    try:
+        source = open_source(args.source)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    total = len(source)
+    if isinstance(source, RegisterTraceReader):
+        source.close()
+    start, stop = args.steps if args.steps is not None else (0, total)
+    stop = min(stop, total)
+
+    # Parse once up front, so notation errors are reported before any work is handed out.
+    for expr in args.registers:
+        try:
+            dump = RegisterNotationParser().parse_register(expr)
+        except TypeError as error:
+            parser.error(str(error))
+        if isinstance(dump.reg_property, MemoryInfo):
+            parser.error(f"memory operands need a live process: {expr!r}")
+
+    out = sys.stdout
+    task = functools.partial(query, args.source, args.registers, args.pc_range, args.where)
+    chunks = [(lo, min(lo + args.chunk, stop)) for lo in range(start, stop, args.chunk)]
+    if args.jobs <= 1 or len(chunks) <= 1:
+        for lo, hi in chunks:
+            out.writelines(line + "\n" for line in task(lo, hi))
+    else:
+        with concurrent.futures.ProcessPoolExecutor(args.jobs) as pool:
+            for lines in pool.map(task, *zip(*chunks)):
+                out.writelines(line + "\n" for line in lines)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())